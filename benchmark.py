@@ -0,0 +1,427 @@
+"""
+The benchmark suite, timing the hot paths of the game: ticking, rendering, drawing the grid, and starting up.
+It runs without a display under SDL_VIDEODRIVER=dummy, saves the results as JSON,
+and compares them against a stored baseline, flagging the regressions:
+
+    SDL_VIDEODRIVER=dummy python benchmark.py --output new.json --baseline old.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+# The two-sided 95% quantiles of the t-distribution by degrees of freedom, beyond which the normal quantile is used
+T_95 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31, 9: 2.26, 10: 2.23,
+        12: 2.18, 15: 2.13, 20: 2.09, 25: 2.06, 30: 2.04}
+
+# The code timed as the startup of the process, which is everything main.py does before the menu loop
+STARTUP = "from window import Window; from menu import Menu; Menu(Window())"
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarize timing samples by their mean and its 95% confidence interval.
+
+    :param samples: The timings in seconds
+    :return: The mean, the half width of its confidence interval, the standard deviation, minimum and sample count
+    """
+
+    n = len(samples)
+    mean = statistics.fmean(samples)
+    stdev = statistics.stdev(samples) if n > 1 else 0.0
+
+    # The quantile of the largest tabled degrees of freedom not above n - 1
+    t = next((T_95[df] for df in sorted(T_95, reverse=True) if df <= n - 1), 1.96) if n <= 31 else 1.96
+
+    return {
+        "mean": mean,
+        "ci95": t * stdev / math.sqrt(n),
+        "stdev": stdev,
+        "min": min(samples),
+        "samples": n
+    }
+
+
+def measure(run: Callable[[], float], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time a case a number of times.
+
+    :param run: A function running the case once, returning the seconds the timed part took
+    :param repeat: The amount of samples to take
+    :param warmup: The amount of runs made before sampling, to warm up caches
+    :return: The summary of the samples
+    """
+
+    for _ in range(warmup):
+        run()
+
+    return summarize([run() for _ in range(repeat)])
+
+
+def timed(function: Callable, *args) -> float:
+    """
+    Time a single call of a function.
+
+    :param function: The function
+    :param args: The arguments to call it with
+    :return: The seconds the call took
+    """
+
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+class Suite:
+    def __init__(self, sizes: List[Tuple[int, int]], densities: List[float], repeat: int, ticks: int):
+        """
+        Initialize the suite, opening a window to draw into.
+
+        :param sizes: The board sizes to time, as (w, h) pairs
+        :param densities: The fractions of live cells in the random boards
+        :param repeat: The amount of samples to take of each case
+        :param ticks: The amount of generations timed in each sample of the tick cases
+        """
+
+        # The game modules are imported here, so the video driver can be picked before pygame is
+        import pygame
+        from config import config
+        from window import Window
+
+        self.pygame = pygame
+        self.config = config
+        self.window = Window()
+
+        self.sizes = sizes
+        self.densities = densities
+        self.repeat = repeat
+        self.ticks = ticks
+
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def game(self, w: int, h: int):
+        """
+        Create a game with a board of the given size, which only lives in memory, as the config is not saved.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        :return: The game.Game
+        """
+
+        from game import Game
+
+        self.config.w = w
+        self.config.h = h
+
+        game = Game(self.window)
+
+        # Pace nothing, so the clocks of the animation never sleep
+        game.game_speed = 1e9
+
+        return game
+
+    @staticmethod
+    def soup(game, density: float, seed: int):
+        """
+        Fill the board of a game with a random soup, a new one for every seed, so no trajectory is replayed.
+
+        :param game: The game.Game
+        :param density: The fraction of live cells
+        :param seed: The seed of the soup
+        :return: None
+        """
+
+        game.map[:] = np.random.default_rng(seed).random(game.map.shape) < density
+        game.simulation.edited = True
+
+    def case(self, name: str, run: Callable[[], float]):
+        """
+        Time a case, and print its result as it comes in.
+
+        :param name: The name of the case, as it is saved
+        :param run: A function running the case once, returning the seconds the timed part took
+        :return: None
+        """
+
+        result = measure(run, self.repeat)
+        self.results[name] = result
+
+        print(f"{name:<40} {result['mean'] * 1000:10.3f} ms ± {result['ci95'] * 1000:.3f}", flush=True)
+
+    def run(self, only: str = ""):
+        """
+        Time every case whose name contains the filter.
+
+        :param only: The filter, an empty string running every case
+        :return: None
+        """
+
+        for bench in (self.bench_tick, self.bench_render, self.bench_grid, self.bench_init, self.bench_startup):
+            bench(lambda name: only in name)
+
+    def bench_tick(self, wanted: Callable[[str], bool]):
+        """
+        Time Game.game_tick across board sizes and densities, per generation.
+
+        :param wanted: Whether a case should be timed, by its name
+        :return: None
+        """
+
+        for w, h in self.sizes:
+            for density in self.densities:
+                name = f"tick/{w}x{h}/{density:g}"
+                if not wanted(name):
+                    continue
+
+                game = self.game(w, h)
+                seeds = iter(range(1_000_000))
+
+                def run():
+                    self.soup(game, density, next(seeds))
+
+                    start = time.perf_counter()
+                    for _ in range(self.ticks):
+                        game.game_tick()
+                    seconds = (time.perf_counter() - start) / self.ticks
+
+                    game.draw_new["cells"].clear()
+                    return seconds
+
+                self.case(name, run)
+                game.close()
+
+    def bench_render(self, wanted: Callable[[str], bool]):
+        """
+        Time Game.render, redrawing the whole board and drawing the cells changed by a generation,
+        with the animation off and on, and zoomed out as far as the camera goes.
+
+        :param wanted: Whether a case should be timed, by its name
+        :return: None
+        """
+
+        from camera import ZOOMS
+
+        for w, h in self.sizes:
+            game = self.game(w, h)
+            self.soup(game, 0.3, 0)
+
+            def full():
+                game.draw_new["all"] = True
+                return timed(game.render)
+
+            def tick(animate: bool):
+                def run():
+                    game.game_tick()
+
+                    game.animate_switch = animate
+                    seconds = timed(game.render)
+                    game.animate_switch = False
+
+                    return seconds
+
+                return run
+
+            def zoomed_out():
+                # The first frame zoomed out counts the whole board, the frames after only the changed cells
+                game.camera.zoom(-len(ZOOMS), 0, 0)
+                game.move_view()
+                game.render()
+
+                seconds = tick(False)()
+
+                game.camera.fit()
+                game.move_view()
+
+                return seconds
+
+            for name, run in ((f"render/{w}x{h}/full", full),
+                              (f"render/{w}x{h}/tick", tick(False)),
+                              (f"render/{w}x{h}/tick-animated", tick(True)),
+                              (f"render/{w}x{h}/zoomed-out", zoomed_out)):
+                if wanted(name):
+                    self.case(name, run)
+
+            game.close()
+
+    def bench_grid(self, wanted: Callable[[str], bool]):
+        """
+        Time drawing the grid of the game and of the menu.
+
+        :param wanted: Whether a case should be timed, by its name
+        :return: None
+        """
+
+        from menu import Menu
+
+        for w, h in self.sizes:
+            if wanted(f"grid/game/{w}x{h}"):
+                game = self.game(w, h)
+                self.case(f"grid/game/{w}x{h}", lambda: timed(game.create_grid))
+                game.close()
+
+            if wanted(f"grid/menu/{w}x{h}"):
+                menu = Menu(self.window)
+                self.case(f"grid/menu/{w}x{h}", lambda: timed(menu.create_grid))
+
+    def bench_init(self, wanted: Callable[[str], bool]):
+        """
+        Time constructing a game.
+
+        :param wanted: Whether a case should be timed, by its name
+        :return: None
+        """
+
+        for w, h in self.sizes:
+            name = f"init/{w}x{h}"
+            if not wanted(name):
+                continue
+
+            def run():
+                start = time.perf_counter()
+                game = self.game(w, h)
+                seconds = time.perf_counter() - start
+
+                game.close()
+                return seconds
+
+            self.case(name, run)
+
+    def bench_startup(self, wanted: Callable[[str], bool]):
+        """
+        Time starting a new process up to the menu, including the interpreter and the imports.
+
+        :param wanted: Whether a case should be timed, by its name
+        :return: None
+        """
+
+        if not wanted("startup"):
+            return
+
+        env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+
+        def run():
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", STARTUP], env=env, check=True)
+            return time.perf_counter() - start
+
+        self.case("startup", run)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Compare results against a baseline.
+    A case has regressed if its mean is slower by more than the threshold,
+    and their confidence intervals do not overlap, so noise alone is not flagged.
+
+    :param results: The results of this run, by case
+    :param baseline: The results of the baseline, by case
+    :param threshold: The fraction a case may be slower by
+    :return: The names of the cases that regressed
+    """
+
+    regressions = []
+
+    print(f"\n{'case':<40} {'baseline':>12} {'now':>12} {'change':>8}")
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        base = baseline[name]
+        change = result["mean"] / base["mean"] - 1
+
+        regressed = change > threshold and result["mean"] - result["ci95"] > base["mean"] + base["ci95"]
+        if regressed:
+            regressions.append(name)
+
+        print(
+            f"{name:<40} {base['mean'] * 1000:9.3f} ms {result['mean'] * 1000:9.3f} ms {change:+8.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+
+    return regressions
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    """
+    Parse a board size given as WxH.
+
+    :param size: The size
+    :return: The width and height
+    """
+
+    w, _, h = size.lower().partition("x")
+    return int(w), int(h)
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Run the suite, save its results and compare them against a baseline.
+
+    :param argv: The arguments, by default those of the process
+    :return: The exit code, 1 if any case regressed
+    """
+
+    parser = argparse.ArgumentParser(description="Time the hot paths of the game of life.")
+    parser.add_argument("--sizes", default="80x45,160x90,320x180", help="the board sizes, as comma separated WxH")
+    parser.add_argument("--densities", default="0.1,0.3,0.5", help="the densities of the random boards")
+    parser.add_argument("--repeat", type=int, default=10, help="the amount of samples of each case")
+    parser.add_argument("--ticks", type=int, default=10, help="the generations timed in each tick sample")
+    parser.add_argument("--filter", default="", help="only run the cases whose name contains this")
+    parser.add_argument("--output", default="", help="the file to save the results to as JSON")
+    parser.add_argument("--baseline", default="", help="a file of saved results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="the slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    suite = Suite(
+        [parse_size(size) for size in args.sizes.split(",")],
+        [float(density) for density in args.densities.split(",")],
+        args.repeat,
+        args.ticks
+    )
+
+    # The config is changed in memory for every board size, so it is restored before anything could save it
+    w, h = suite.config.w, suite.config.h
+    try:
+        suite.run(args.filter)
+    finally:
+        suite.config.w, suite.config.h = w, h
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "numpy": np.__version__,
+                    "pygame": suite.pygame.version.ver,
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S")
+                },
+                "results": suite.results
+            }, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+
+        regressions = compare(suite.results, baseline, args.threshold)
+
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
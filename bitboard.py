@@ -0,0 +1,357 @@
+"""
+This file contains a bit-packed board, an alternative to the byte per cell map used by the game class.
+Every row is stored as 64-bit words, and the next generation is computed with bitwise adder logic,
+processing 64 cells per operation.
+"""
+
+import numpy as np
+from typing import Tuple
+
+from engines import Engine, register
+
+# Shift amounts as uint64, so numpy never promotes the words to floats
+ONE = np.uint64(1)
+SIXTY_THREE = np.uint64(63)
+
+# The amount of rows stepped at once, which bounds the size of the temporary arrays
+BAND_ROWS = 1024
+
+
+def half_add(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Add two bit-planes.
+
+    :param a: The first bit-plane
+    :param b: The second bit-plane
+    :return: The sum bits and the carry bits
+    """
+
+    return a ^ b, a & b
+
+
+def full_add(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Add three bit-planes.
+
+    :param a: The first bit-plane
+    :param b: The second bit-plane
+    :param c: The third bit-plane
+    :return: The sum bits and the carry bits
+    """
+
+    t = a ^ b
+    return t ^ c, (a & b) | (t & c)
+
+
+def west(words: np.ndarray) -> np.ndarray:
+    """
+    Shift the rows one cell towards higher column indexes, so every cell lines up with its left neighbor.
+
+    :param words: The rows to shift, as 64-bit words
+    :return: The shifted rows
+    """
+
+    shifted = words << ONE
+    shifted[:, 1:] |= words[:, :-1] >> SIXTY_THREE
+    return shifted
+
+
+def east(words: np.ndarray) -> np.ndarray:
+    """
+    Shift the rows one cell towards lower column indexes, so every cell lines up with its right neighbor.
+
+    :param words: The rows to shift, as 64-bit words
+    :return: The shifted rows
+    """
+
+    shifted = words >> ONE
+    shifted[:, :-1] |= words[:, 1:] << SIXTY_THREE
+    return shifted
+
+
+@register("bitboard")
+class BitBoard(Engine):
+    def __init__(self, w: int, h: int, **options):
+        """
+        Initialize an empty bit-packed board.
+        Cell j of a row is bit j % 64 of word j // 64, and the cells outside the board are always dead.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        """
+
+        super().__init__(w, h, **options)
+
+        self.words = (w + 63) // 64
+
+        # A single buffer with a dead row above and below, stepped in place a band of rows at a time
+        self.buffer = np.zeros((h + 2, self.words), dtype="<u8")
+
+        # The words that changed in the last generation, as their indexes into the flattened board and the changed bits,
+        # and the changed cells once located from them, None until asked for
+        self.changed_words = (np.zeros(0, dtype="intp"), np.zeros(0, dtype="<u8"))
+        self.last = (np.zeros(0, dtype="intp"), np.zeros(0, dtype="intp"))
+
+        # Mask of the bits in the last word of a row that are part of the board
+        self.last_mask = np.uint64((1 << (w - 64 * (self.words - 1))) - 1)
+
+        # The position of the last cell of a row, within the last word
+        self.last_bit = np.uint64((w - 1) % 64)
+
+    @property
+    def board(self) -> np.ndarray:
+        """
+        The rows of the current generation, without the padding.
+
+        :return: A np.ndarray of shape (h, words)
+        """
+
+        return self.buffer[1:-1]
+
+    def load(self, board: np.ndarray):
+        """
+        Load the board from a map of the kind used by the game class.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        self.board[:] = self.pack(board)
+        self.wrap(self.buffer)
+
+        self.changed_words = (np.zeros(0, dtype="intp"), np.zeros(0, dtype="<u8"))
+        self.last = (np.zeros(0, dtype="intp"), np.zeros(0, dtype="intp"))
+
+    def pack(self, board: np.ndarray) -> np.ndarray:
+        """
+        Pack the rows of a map into 64-bit words.
+
+        :param board: A np.ndarray of shape (rows, w), where non-zero cells are alive
+        :return: A np.ndarray of shape (rows, words)
+        """
+
+        packed = np.packbits(board.astype("bool"), axis=1, bitorder="little")
+
+        rows = np.zeros((board.shape[0], self.words * 8), dtype="uint8")
+        rows[:, :packed.shape[1]] = packed
+
+        return rows.view("<u8")
+
+    def unpack(self, words: np.ndarray) -> np.ndarray:
+        """
+        Unpack rows of 64-bit words into the rows of a map.
+
+        :param words: A np.ndarray of shape (rows, words)
+        :return: A np.ndarray of shape (rows, w)
+        """
+
+        return np.unpackbits(words.view("uint8"), axis=1, count=self.w, bitorder="little")
+
+    def wrap(self, buffer: np.ndarray):
+        """
+        Refresh the padding rows of a buffer according to the topology.
+        The padding columns do not exist in the packed rows, so step_rows wraps those while shifting.
+
+        :param buffer: A buffer of shape (h + 2, words)
+        :return: None
+        """
+
+        if self.topology == "mirror":
+            buffer[0] = buffer[1]
+            buffer[-1] = buffer[-2]
+
+        elif self.topology == "torus":
+            buffer[0] = buffer[-2]
+            buffer[-1] = buffer[1]
+
+        # A Klein bottle joins the top and bottom edge the other way around, which reverses the bits of the row
+        elif self.topology == "klein":
+            buffer[0] = self.pack(self.unpack(buffer[-2:-1])[:, ::-1])[0]
+            buffer[-1] = self.pack(self.unpack(buffer[1:2])[:, ::-1])[0]
+
+    def export(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Export the board to a map of the kind used by the game class.
+
+        :param out: An optional np.ndarray of shape (h, w) to write the cells into
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        cells = self.unpack(self.board)
+
+        if out is None:
+            return cells
+
+        out[:] = cells
+        return out
+
+    def advance(self, n: int):
+        """
+        Advance the board n generations.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        if n <= 0:
+            return
+
+        # The changed words are only recorded in the last generation, as only that one is asked for,
+        # and the cells in them are only located once asked for
+        for i in range(n):
+            self.step_bands(i == n - 1)
+            self.wrap(self.buffer)
+
+        self.last = None
+
+    def step_bands(self, track: bool = True):
+        """
+        Step the board in place, a band of rows at a time.
+        Only the row above a band has been overwritten by the time it is stepped, so that one row of the old
+        generation is kept aside, and the padding rows still hold the old generation until it is wrapped again.
+
+        :param track: Whether to record the words that changed, while the band is at hand
+        :return: None
+        """
+
+        buffer = self.buffer
+        above_band = buffer[0].copy()
+
+        changed_words = []
+        changed_bits = []
+
+        for start in range(0, self.h, BAND_ROWS):
+            stop = min(self.h, start + BAND_ROWS)
+
+            row = buffer[start + 1:stop + 1]
+            above = np.concatenate((above_band[None], buffer[start + 1:stop]))
+            new = self.step_rows(above, row, buffer[start + 2:stop + 2])
+
+            if track:
+                diff = (new ^ row).ravel()
+                words = np.flatnonzero(diff)
+                changed_words.append(words + start * self.words)
+                changed_bits.append(diff[words])
+
+            above_band = buffer[stop].copy()
+            row[:] = new
+
+        if track and changed_words:
+            self.changed_words = (np.concatenate(changed_words), np.concatenate(changed_bits))
+        elif track:
+            self.changed_words = (np.zeros(0, dtype="intp"), np.zeros(0, dtype="<u8"))
+
+    def neighbors(self, words: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Shift the rows both ways, so every cell lines up with its left and with its right neighbor.
+        The cells shifted in past the edges are dead, or taken from the edges according to the topology.
+
+        :param words: The rows to shift, as 64-bit words
+        :return: The rows shifted west and east
+        """
+
+        shifted_west = west(words)
+        shifted_east = east(words)
+
+        if self.topology == "dead":
+            return shifted_west, shifted_east
+
+        first = words[:, 0] & ONE
+        last = (words[:, -1] >> self.last_bit) & ONE
+
+        # The mirrored board neighbors its own edge cells, the others the cells on the opposite edge
+        if self.topology == "mirror":
+            first, last = last, first
+
+        shifted_west[:, 0] |= last
+        shifted_east[:, -1] |= first << self.last_bit
+
+        return shifted_west, shifted_east
+
+    def step_rows(self, above: np.ndarray, row: np.ndarray, below: np.ndarray) -> np.ndarray:
+        """
+        Compute the next generation of a band of rows, given the rows above and below each of them.
+        The eight neighbors are summed as bit-planes: each row triple is reduced with adders,
+        and the partial sums are combined into a ones, twos, fours and eights bit per cell.
+
+        :param above: The row above each row
+        :param row: The rows themselves
+        :param below: The row below each row
+        :return: The next generation of the rows
+        """
+
+        west_above, east_above = self.neighbors(above)
+        west_below, east_below = self.neighbors(below)
+        west_row, east_row = self.neighbors(row)
+
+        # Sum the neighbors in each of the three rows, the middle row excluding the cell itself
+        sum_above, carry_above = full_add(west_above, above, east_above)
+        sum_below, carry_below = full_add(west_below, below, east_below)
+        sum_row, carry_row = half_add(west_row, east_row)
+
+        # Combine the partial sums into the bits of the neighbor count
+        ones, twos_a = full_add(sum_above, sum_row, sum_below)
+        twos_b, fours_a = full_add(carry_above, carry_row, carry_below)
+        twos, fours_b = half_add(twos_a, twos_b)
+        fours, eights = half_add(fours_a, fours_b)
+
+        planes = (ones, twos, fours, eights)
+        new = np.zeros_like(row)
+
+        # Match the count against every count of the rule, bit-plane by bit-plane,
+        # and keep the matches of the counts dead cells are born with, or live cells survive with
+        for count in sorted(self.birth | self.survival):
+            match = np.full_like(row, ~np.uint64(0))
+            for bit, plane in enumerate(planes):
+                match &= plane if count >> bit & 1 else ~plane
+
+            if count not in self.survival:
+                match &= ~row
+            elif count not in self.birth:
+                match &= row
+
+            new |= match
+
+        # Keep the bits past the edge of the board dead
+        new[:, -1] &= self.last_mask
+
+        return new
+
+    def last_changed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The cells that changed in the last generation, located in the words recorded while stepping the bands
+        the first time asked for, so stepping only pays for the words unless the cells are used.
+
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        if self.last is None:
+            self.last = self.changed_bits(*self.changed_words)
+
+        return self.last
+
+    def changed_bits(self, words: np.ndarray, bits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Locate the set bits of the words that changed between two generations.
+
+        :param words: The indexes of the changed words into the flattened board
+        :param bits: The changed words of one generation XOR the other, as 64-bit words
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        rows, words = np.divmod(words, self.words)
+
+        # Unpack only the words that changed, and locate the changed bits within them, 64 bits to a word
+        index = np.flatnonzero(np.unpackbits(bits.view("uint8"), bitorder="little"))
+        word = index >> 6
+
+        return rows[word], words[word] * 64 + (index & 63)
+
+    def population(self) -> int:
+        """
+        Count the live cells on the board.
+
+        :return: The amount of live cells
+        """
+
+        return int(np.unpackbits(self.board.view("uint8")).sum())
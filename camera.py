@@ -0,0 +1,157 @@
+"""
+This file contains the camera, which maps the cells of the board to pixels on the screen.
+It pans and zooms over the board, so boards far larger than the screen can be explored,
+and tells which cells are visible, so only those have to be drawn.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import math
+from typing import Tuple
+
+# The sizes of a cell in pixels the camera zooms between, below 1 several cells share a pixel
+ZOOMS = (1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 96, 128)
+
+# The smallest cells in pixels the grid is drawn around, as below that it would cover the cells
+GRID_MIN = 6
+
+
+class Camera:
+    def __init__(self, w: int, h: int, width: int, height: int):
+        """
+        Initialize a camera, showing the whole board if it fits on the screen.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        :param width: The width of the screen in pixels
+        :param height: The height of the screen in pixels
+        """
+
+        self.w = w
+        self.h = h
+        self.width = width
+        self.height = height
+
+        # The size of a cell in pixels, and the screen position of the top-left corner of the board
+        self.size = 1
+        self.x = 0
+        self.y = 0
+
+        self.fit()
+
+    def fit(self):
+        """
+        Zoom to the largest whole cells that fit the board on the screen, or the largest zoom level if none do,
+        and centre the board.
+
+        :return: None
+        """
+
+        fitted = min(self.width // self.w, self.height // self.h)
+
+        if not fitted:
+            fitted = max((zoom for zoom in ZOOMS if zoom * self.w <= self.width and zoom * self.h <= self.height),
+                         default=ZOOMS[0])
+
+        self.size = fitted
+        self.x = int(self.width - self.w * self.size) // 2
+        self.y = int(self.height - self.h * self.size) // 2
+
+    @property
+    def grid(self) -> bool:
+        """
+        Whether the cells are large enough for the grid to be drawn around them.
+
+        :return: Whether the grid is drawn
+        """
+
+        return self.size >= GRID_MIN
+
+    def clamp(self):
+        """
+        Keep the centre of the screen over the board, so it can not be panned out of sight.
+
+        :return: None
+        """
+
+        self.x = int(min(self.width // 2, max(self.width // 2 - self.w * self.size, self.x)))
+        self.y = int(min(self.height // 2, max(self.height // 2 - self.h * self.size, self.y)))
+
+    def pan(self, dx: int, dy: int):
+        """
+        Move the board across the screen.
+
+        :param dx: The pixels to move it right
+        :param dy: The pixels to move it down
+        :return: None
+        """
+
+        self.x += dx
+        self.y += dy
+        self.clamp()
+
+    def zoom(self, steps: int, x: int, y: int) -> bool:
+        """
+        Zoom in or out by a number of zoom levels, keeping the cell under the given point in place.
+
+        :param steps: The zoom levels to zoom in, negative zooming out
+        :param x: The x coordinate of the point in pixels
+        :param y: The y coordinate of the point in pixels
+        :return: Whether the zoom changed, which it does not past the first or last level
+        """
+
+        if not steps:
+            return False
+
+        # The fitted size may lie between two levels, in which case the first step lands on the next one
+        if steps > 0:
+            larger = [zoom for zoom in ZOOMS if zoom > self.size]
+            size = larger[min(steps, len(larger)) - 1] if larger else self.size
+        else:
+            smaller = [zoom for zoom in ZOOMS if zoom < self.size]
+            size = smaller[max(steps, -len(smaller))] if smaller else self.size
+
+        if size == self.size:
+            return False
+
+        self.x = round(x - (x - self.x) * size / self.size)
+        self.y = round(y - (y - self.y) * size / self.size)
+        self.size = size
+        self.clamp()
+
+        return True
+
+    def visible(self) -> Tuple[slice, slice]:
+        """
+        Find the cells that are at least partly on the screen.
+
+        :return: The slices of rows and columns of the visible cells
+        """
+
+        top = max(0, math.floor(-self.y / self.size))
+        bottom = min(self.h, math.ceil((self.height - self.y) / self.size))
+        left = max(0, math.floor(-self.x / self.size))
+        right = min(self.w, math.ceil((self.width - self.x) / self.size))
+
+        return slice(top, max(top, bottom)), slice(left, max(left, right))
+
+    def cell_at(self, x: int, y: int) -> Tuple[int, int]:
+        """
+        Find the cell under a point on the screen, which may lie outside of the board.
+
+        :param x: The x coordinate in pixels
+        :param y: The y coordinate in pixels
+        :return: The row and column of the cell
+        """
+
+        return math.floor((y - self.y) / self.size), math.floor((x - self.x) / self.size)
+
+    def position(self, i: int, j: int) -> Tuple[int, int]:
+        """
+        Find the top-left corner of a cell on the screen.
+
+        :param i: The row of the cell
+        :param j: The column of the cell
+        :return: The x and y coordinates in pixels
+        """
+
+        return int(self.x + j * self.size), int(self.y + i * self.size)
@@ -0,0 +1,207 @@
+"""
+This file contains an unbounded engine, which stores the board as a dict of fixed-size chunks keyed by their position.
+Only chunks holding live cells are kept, so memory follows the live population rather than the area it spans,
+and patterns such as spaceships carry on past the edges of the map rather than running into them.
+"""
+
+import numpy as np
+from typing import Dict, Set, Tuple
+
+import rules
+from engines import Engine, register
+
+# The side length of the chunks
+CHUNK_SIZE = 64
+
+# The offsets of the eight chunks around a chunk
+NEIGHBORS = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj]
+
+
+@register("chunks")
+class ChunkEngine(Engine):
+    # The board goes on past the edges of the map it is exported to
+    unbounded = True
+
+    def __init__(self, w: int, h: int, **options):
+        """
+        Initialize an empty, unbounded board.
+        Only the chunks that changed last generation, and the chunks around them, are stepped.
+
+        :param w: The width of the exported map in cells
+        :param h: The height of the exported map in cells
+        """
+
+        super().__init__(w, h, **options)
+
+        # The chunks holding live cells, keyed by their chunk row and column, and the chunks that changed last generation
+        self.chunks: Dict[Tuple[int, int], np.ndarray] = {}
+        self.active: Set[Tuple[int, int]] = set()
+
+        # A padded scratch buffer a chunk and the edges of its neighbors are gathered into, and its neighbor views
+        self.buffer = np.zeros((CHUNK_SIZE + 2, CHUNK_SIZE + 2), dtype="uint8")
+        self.views = rules.neighbor_views(self.buffer)
+        self.counts = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype="uint8")
+        self.masks = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype="uint16")
+
+        self.rows = np.zeros(0, dtype="intp")
+        self.cols = np.zeros(0, dtype="intp")
+
+    @property
+    def population(self) -> int:
+        """
+        The live cells on the whole board, including those past the edges of the map.
+
+        :return: The population
+        """
+
+        return sum(int(np.count_nonzero(chunk)) for chunk in self.chunks.values())
+
+    def load(self, board: np.ndarray):
+        """
+        Load the board from a map of the kind used by the game class, clearing everything past its edges.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        self.chunks.clear()
+
+        for ci in range(-(-self.h // CHUNK_SIZE)):
+            for cj in range(-(-self.w // CHUNK_SIZE)):
+                cells = board[ci * CHUNK_SIZE:(ci + 1) * CHUNK_SIZE, cj * CHUNK_SIZE:(cj + 1) * CHUNK_SIZE]
+
+                if cells.any():
+                    chunk = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype="uint8")
+                    chunk[:cells.shape[0], :cells.shape[1]] = cells != 0
+                    self.chunks[ci, cj] = chunk
+
+        self.active = set(self.chunks)
+
+    def export(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Export the part of the board covered by the map.
+
+        :param out: An optional np.ndarray of shape (h, w) to write the cells into
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        if out is None:
+            out = np.zeros((self.h, self.w), dtype="uint8")
+        else:
+            out.fill(0)
+
+        for (ci, cj), chunk in self.chunks.items():
+            top, left = ci * CHUNK_SIZE, cj * CHUNK_SIZE
+
+            if top < self.h and left < self.w and top >= 0 and left >= 0:
+                cells = out[top:top + CHUNK_SIZE, left:left + CHUNK_SIZE]
+                cells[:] = chunk[:cells.shape[0], :cells.shape[1]]
+
+        return out
+
+    def gather(self, key: Tuple[int, int]) -> bool:
+        """
+        Gather a chunk and the bordering cells of its neighbors into the padded scratch buffer.
+
+        :param key: The chunk row and column
+        :return: Whether any cell was gathered, as an empty neighborhood stays empty
+        """
+
+        ci, cj = key
+        buffer = self.buffer
+        buffer.fill(0)
+
+        found = False
+
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            buffer[1:-1, 1:-1] = chunk
+            found = True
+
+        for di, dj in NEIGHBORS:
+            neighbor = self.chunks.get((ci + di, cj + dj))
+            if neighbor is None:
+                continue
+
+            # The row or column of the neighbor facing the chunk, or its facing corner, lands in the padding
+            rows = slice(0, 1) if di < 0 else slice(-1, None) if di > 0 else slice(1, -1)
+            cols = slice(0, 1) if dj < 0 else slice(-1, None) if dj > 0 else slice(1, -1)
+            src_rows = slice(-1, None) if di < 0 else slice(0, 1) if di > 0 else slice(None)
+            src_cols = slice(-1, None) if dj < 0 else slice(0, 1) if dj > 0 else slice(None)
+
+            buffer[rows, cols] = neighbor[src_rows, src_cols]
+            found = True
+
+        return found
+
+    def advance(self, n: int):
+        """
+        Advance the board n generations.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        for _ in range(n):
+            self.rows, self.cols = self.step_chunks()
+
+    def step_chunks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Step the chunks that changed last generation and the chunks around them, allocating chunks as life reaches them
+        and freeing the chunks that die out. Every other chunk is unchanged.
+
+        :return: The row and column indexes of the cells of the map that changed, as two np.ndarrays
+        """
+
+        stepped = set(self.active)
+        for ci, cj in self.active:
+            stepped.update((ci + di, cj + dj) for di, dj in NEIGHBORS)
+
+        # The new chunks are only stored once every chunk has been stepped from the old ones
+        results = {}
+        changed_rows = []
+        changed_cols = []
+
+        for key in stepped:
+            if not self.gather(key):
+                continue
+
+            new = np.empty((CHUNK_SIZE, CHUNK_SIZE), dtype="uint8")
+            rules.step(self.views, self.buffer[1:-1, 1:-1], new, self.counts, self.masks, self.lookup)
+
+            if not self.counts.any():
+                continue
+
+            results[key] = new
+
+            ci, cj = key
+            if ci * CHUNK_SIZE < self.h and cj * CHUNK_SIZE < self.w and ci >= 0 and cj >= 0:
+                rows, cols = np.nonzero(self.counts)
+                rows += ci * CHUNK_SIZE
+                cols += cj * CHUNK_SIZE
+
+                inside = (rows < self.h) & (cols < self.w)
+                changed_rows.append(rows[inside])
+                changed_cols.append(cols[inside])
+
+        for key, new in results.items():
+            if new.any():
+                self.chunks[key] = new
+            else:
+                self.chunks.pop(key, None)
+
+        self.active = set(results)
+
+        rows = np.concatenate(changed_rows) if changed_rows else np.zeros(0, dtype="intp")
+        cols = np.concatenate(changed_cols) if changed_cols else np.zeros(0, dtype="intp")
+
+        return rows, cols
+
+    def last_changed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The cells of the map that changed in the last generation, as found while stepping the chunks.
+
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        return self.rows, self.cols
@@ -27,16 +27,28 @@ class Config:
         :return: None
         """
 
-        # Load the config.json file, and parse it with json
-        with open("resources/config.json", "r") as f:
+        # Load the config.default.json and config.json files, and parse them with json
+        with open("resources/config.default.json", "r") as f:
             data = json.load(f)
 
+        with open("resources/config.json", "r") as f:
+            saved = json.load(f)
+
+        # The saved config is laid over the default one, section by section,
+        # so a config saved before a section or entry was added gets its default value
+        for k, v in saved.items():
+            if isinstance(v, dict) and isinstance(data.get(k), dict):
+                data[k].update(v)
+            else:
+                data[k] = v
+
         # Flatten the data to simplify handling
         flatten_data = {
             **data["field-dimensions"],
             "game_speed": data["game-speed"],
             **data["animation"],
-            **data["colors"]
+            **data["colors"],
+            **data["simulation"]
         }
 
         self.content = {}
@@ -101,6 +113,26 @@ class Config:
                 "color-buttons-border": self.color_buttons_border,
                 "color-buttons-text": self.color_buttons_text,
                 "color-text": self.color_text
+            },
+            "simulation": {
+                "jump-generations": self.jump_generations,
+                "hashlife-memory": self.hashlife_memory,
+                "cycle-history": self.cycle_history,
+                "trajectory-memory": self.trajectory_memory,
+                "trajectory-directory": self.trajectory_directory,
+                "trajectory-disk": self.trajectory_disk,
+                "stats-log": self.stats_log,
+                "metrics-port": self.metrics_port,
+                "turbo": self.turbo,
+                "turbo-generations": self.turbo_generations,
+                "turbo-budget": self.turbo_budget,
+                "frame-rate": self.frame_rate,
+                "worker-process": self.worker_process,
+                "zoom-shading": self.zoom_shading,
+                "workers": self.workers,
+                "engine": self.engine,
+                "rule": self.rule,
+                "topology": self.topology
             }
         }
 
@@ -0,0 +1,177 @@
+"""
+This file contains the cycle detector, which notices when the board returns to a state it has been in before.
+From then on the board only repeats itself, so the generations can be replayed from the cycle rather than computed.
+The board is hashed incrementally from the cells that change, so looking a generation up costs as much as its changes.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple
+
+# The constants of the splitmix64 mixer, which turns the index of a cell into its random 64 bit key
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def keys(cells: np.ndarray) -> np.ndarray:
+    """
+    Find the Zobrist keys of cells, which are mixed from their indexes rather than stored,
+    so they take no memory however large the board is.
+
+    :param cells: The indexes of the cells into the flattened board
+    :return: The keys, as a np.ndarray of uint64
+    """
+
+    z = (cells.astype("uint64") + np.uint64(1)) * GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * MIX_1
+    z = (z ^ (z >> np.uint64(27))) * MIX_2
+
+    return z ^ (z >> np.uint64(31))
+
+
+class CycleDetector:
+    def __init__(self, history: int = 1024):
+        """
+        Initialize the detector, which keeps the hashes of the most recent generations to look for repeats in.
+        A repeated hash is only a candidate, which is confirmed by comparing the boards a period apart.
+
+        :param history: The amount of generations to keep the hashes of, which bounds the longest period found
+        """
+
+        self.history = history
+
+        self.generation = 0
+
+        # The width of the board, and the Zobrist hash of the current generation, the XOR of the keys of its live cells
+        self.w = 0
+        self.key = 0
+
+        # The hashes of the recent generations, mapped to their generation, oldest first
+        self.seen: Dict[int, int] = {}
+
+        # The generation a repeated hash was first seen at, the generation it was seen again at and the period between,
+        # and a copy of the board it was seen again at, until confirmed
+        self.candidate = None
+        self.snapshot = None
+
+        # The generation the cycle starts at and its period, once found
+        self.start = None
+        self.period = None
+
+        # The cells that change in every generation of the cycle, recorded during the first period after it is found
+        self.cycle: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def reset(self, board: np.ndarray, generation: int = 0):
+        """
+        Forget everything, and start over from the given board.
+
+        :param board: The board, as a C-contiguous np.ndarray
+        :param generation: The generation of the board, 0 unless the board was jumped to
+        :return: None
+        """
+
+        self.generation = generation
+        self.seen.clear()
+        self.candidate = None
+        self.snapshot = None
+        self.start = None
+        self.period = None
+        self.cycle = []
+
+        if self.history:
+            self.w = board.shape[1]
+            self.key = self.hash(np.flatnonzero(board))
+            self.seen[self.key] = generation
+
+    @staticmethod
+    def hash(cells: np.ndarray) -> int:
+        """
+        Hash a set of cells, as the XOR of their keys.
+        Flipping cells flips their keys in the hash, so the hash of a board is updated by hashing the changed cells.
+
+        :param cells: The indexes of the cells into the flattened board
+        :return: The hash
+        """
+
+        return int(np.bitwise_xor.reduce(keys(cells)))
+
+    @property
+    def stable(self) -> bool:
+        """
+        Whether the board has been found to repeat itself.
+
+        :return: Whether a cycle has been found
+        """
+
+        return self.period is not None
+
+    @property
+    def replaying(self) -> bool:
+        """
+        Whether the whole cycle has been recorded, so the next generations can be replayed from it.
+
+        :return: Whether the next generations can be replayed
+        """
+
+        return self.period is not None and len(self.cycle) == self.period
+
+    def record(self, board: np.ndarray, changed: Tuple[np.ndarray, np.ndarray]):
+        """
+        Record the next generation, and look it up among the recent ones.
+        Once a repeat is found, the changes of the following period are kept as the cycle,
+        and the board at its end is compared to the board at its start, as different boards may share a hash.
+
+        :param board: The board of the next generation, as a C-contiguous np.ndarray
+        :param changed: The row and column indexes of the cells that changed to get there
+        :return: None
+        """
+
+        if not self.history or self.period is not None:
+            return
+
+        self.generation += 1
+
+        rows, cols = changed
+        self.key ^= self.hash(np.asarray(rows, dtype="int64") * self.w + cols)
+
+        if self.candidate is not None:
+            self.cycle.append(changed)
+
+            first, found, period = self.candidate
+            if self.generation - found == period:
+                if np.array_equal(board, self.snapshot):
+                    self.start = first
+                    self.period = period
+                    self.seen.clear()
+                    self.snapshot = None
+                    return
+
+                self.candidate = None
+                self.snapshot = None
+                self.cycle = []
+
+        elif self.key in self.seen:
+            first = self.seen[self.key]
+            self.candidate = (first, self.generation, self.generation - first)
+            self.snapshot = board.copy()
+
+        # A hash seen again is moved to the end, so the oldest generation stays first
+        self.seen.pop(self.key, None)
+        self.seen[self.key] = self.generation
+
+        # Dicts keep their insertion order, so the first key is the oldest generation
+        if len(self.seen) > self.history:
+            del self.seen[next(iter(self.seen))]
+
+    def replay(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Advance one generation along the recorded cycle.
+
+        :return: The row and column indexes of the cells that change, as two np.ndarrays
+        """
+
+        changed = self.cycle[(self.generation - self.start) % self.period]
+        self.generation += 1
+
+        return changed
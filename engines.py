@@ -0,0 +1,417 @@
+"""
+This file contains the interface of the simulation engines, the registry used to pick one by name,
+and the default engine, which steps the board in tiles with NumPy.
+The game only talks to engines through the Engine interface, so any registered engine can be swapped in.
+"""
+
+import numpy as np
+from typing import Tuple, Dict, Iterable
+
+import rules
+
+# The side length of the tiles used to skip the parts of the board that did not change
+TILE_SIZE = 32
+
+# The amount of tile rows stepped in one band, which bounds the size of the scratch arrays
+BAND_TILES = 8
+
+# The fraction of tiles of a band that have to be stepped, for the band to be stepped whole in one go
+DENSE = 0.5
+
+# The engines that can be picked by name, filled in by the register decorator
+ENGINES: Dict[str, type] = {}
+
+
+def register(name: str):
+    """
+    A class decorator, registering an engine under a name.
+
+    :param name: The name the engine is picked by in the config
+    :return: The decorator
+    """
+
+    def decorator(cls):
+        cls.name = name
+        ENGINES[name] = cls
+        return cls
+
+    return decorator
+
+
+def create(name: str, w: int, h: int, **options) -> "Engine":
+    """
+    Create an engine by its registered name.
+
+    :param name: The name of the engine
+    :param w: The width of the board in cells
+    :param h: The height of the board in cells
+    :param options: Extra options, such as workers, which each engine takes or ignores
+    :return: The engine
+    """
+
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine \"{name}\", please use one of: {', '.join(ENGINES)}")
+
+    return ENGINES[name](w, h, **options)
+
+
+class Engine:
+    # The registered name of the engine, set by the register decorator
+    name = ""
+
+    # Whether the board goes on past the edges of the map, so the map alone does not tell the whole state
+    unbounded = False
+
+    def __init__(self, w: int, h: int, rule: str = rules.CONWAY, topology: str = "dead", **options):
+        """
+        The interface every engine implements. An engine owns the board it steps,
+        the game loads its map into it, steps it and reads back the cells that changed.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        :param rule: The rule the board is stepped by, as a rulestring in B/S notation
+        :param topology: What lies past the edges of the board, one of rules.TOPOLOGIES
+        :param options: Extra options, which are ignored unless the engine uses them
+        """
+
+        self.w = w
+        self.h = h
+
+        # The rule, both as the sets of neighbor counts and compiled into a lookup table
+        self.check(rule, topology)
+
+        self.rule = rule
+        self.birth, self.survival = rules.parse(rule)
+        self.lookup = rules.lookup_table(rule)
+        self.topology = topology
+
+        # The cells that changed in the last step, if it was more than one generation
+        self.diff = None
+
+    @classmethod
+    def check(cls, rule: str, topology: str):
+        """
+        Check the engine can run a rule and topology, without creating it.
+        An unbounded engine can not run rules with B0, or topologies other than dead.
+
+        :param rule: The rule, as a rulestring in B/S notation
+        :param topology: What lies past the edges of the board, one of rules.TOPOLOGIES
+        :return: None, raising a ValueError if the engine can not run them
+        """
+
+        birth, _ = rules.parse(rule)
+
+        if topology not in rules.TOPOLOGIES:
+            raise ValueError(f"Unknown topology \"{topology}\", please use one of: {', '.join(rules.TOPOLOGIES)}")
+
+        # With B0 the empty space would come alive, so it could not be left out of an unbounded board
+        if cls.unbounded and 0 in birth:
+            raise ValueError(f"The {cls.name} engine can not run the rule {rule}, as dead cells are born without neighbors")
+
+        # An unbounded board has no edges to wrap around, past the edges of the map the cells simply go on
+        if cls.unbounded and topology != "dead":
+            raise ValueError(f"The {cls.name} engine can not run the {topology} topology, as its board is unbounded")
+
+    def load(self, board: np.ndarray):
+        """
+        Load the board from a map of the kind used by the game class.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        raise NotImplementedError
+
+    def export(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Export the board to a map of the kind used by the game class.
+
+        :param out: An optional np.ndarray of shape (h, w) to write the cells into
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        raise NotImplementedError
+
+    def advance(self, n: int):
+        """
+        Advance the board n generations.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        raise NotImplementedError
+
+    def last_changed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the cells that changed in the last generation.
+
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        raise NotImplementedError
+
+    def step(self, n: int = 1):
+        """
+        Advance the board n generations, keeping track of the cells that change.
+        A single generation is tracked by the engine itself, longer steps compare the board before and after.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        if n == 1:
+            self.advance(1)
+            self.diff = None
+            return
+
+        before = self.export()
+        self.advance(n)
+        self.diff = np.nonzero(self.export() != before)
+
+    def changed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the cells that changed in the last step.
+
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        if self.diff is not None:
+            return self.diff
+
+        return self.last_changed()
+
+    def close(self):
+        """
+        Free anything the engine holds on to outside of the process, such as workers.
+
+        :return: None
+        """
+
+
+@register("numpy")
+class TileEngine(Engine):
+    def __init__(self, w: int, h: int, **options):
+        """
+        The default engine, keeping the board in two padded buffers that are swapped every generation.
+        The board is split into tiles, and only the tiles that changed last generation, or their neighbors, are stepped.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        """
+
+        super().__init__(w, h, **options)
+
+        # Each buffer has a one cell wide border that is always dead, so the neighbor sums need no edge handling
+        self.buffers = [np.zeros((h + 2, w + 2), dtype="uint8") for _ in range(2)]
+        self.maps = [buffer[1:-1, 1:-1] for buffer in self.buffers]
+
+        # The eight shifted views of each buffer, lining the neighbors of every cell up with the cell itself
+        self.neighbor_views = [rules.neighbor_views(buffer) for buffer in self.buffers]
+
+        # Scratch buffers for the neighbor counts and the lookup table rows of a band of tile rows,
+        # reused for every band, so they take a fraction of the board however large it is
+        rows = min(-(-h // TILE_SIZE), BAND_TILES) * TILE_SIZE
+        self.counts = np.zeros((rows, -(-w // TILE_SIZE) * TILE_SIZE), dtype="uint8")
+        self.masks = np.zeros((rows, w), dtype="uint16")
+
+        self.active = np.zeros((-(-h // TILE_SIZE), -(-w // TILE_SIZE)), dtype="bool")
+        self.front = 0
+
+        self.rows = np.zeros(0, dtype="intp")
+        self.cols = np.zeros(0, dtype="intp")
+
+    def load(self, board: np.ndarray):
+        """
+        Load the board into both buffers, so the idle tiles are the same in both, and mark every tile as active.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        for buffer in self.maps:
+            buffer[:] = board
+
+        rules.wrap(self.buffers[self.front], self.topology)
+
+        self.active.fill(True)
+
+    def export(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Export the front buffer.
+
+        :param out: An optional np.ndarray of shape (h, w) to write the cells into
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        if out is None:
+            return self.maps[self.front].copy()
+
+        out[:] = self.maps[self.front]
+        return out
+
+    def advance(self, n: int):
+        """
+        Advance the board n generations, swapping the buffers after each.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        for _ in range(n):
+            self.rows, self.cols = self.step_active()
+            self.front = 1 - self.front
+
+            rules.wrap(self.buffers[self.front], self.topology)
+
+    def last_changed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The cells that changed in the last generation, as found while stepping the active tiles.
+
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        return self.rows, self.cols
+
+    def step_region(self, rows: slice, cols: slice, counts: np.ndarray, masks: np.ndarray):
+        """
+        Calculate the next generation of a region of cells into the back buffer.
+
+        :param rows: The slice of rows of the region
+        :param cols: The slice of columns of the region
+        :param counts: The scratch counts of the region, which afterwards are non-zero for the cells that changed
+        :param masks: The scratch masks of the region
+        :return: None
+        """
+
+        rules.step(
+            [view[rows, cols] for view in self.neighbor_views[self.front]],
+            self.maps[self.front][rows, cols],
+            self.maps[1 - self.front][rows, cols],
+            counts,
+            masks,
+            self.lookup
+        )
+
+    def stepped_tiles(self) -> np.ndarray:
+        """
+        Find the tiles that have to be stepped, which are the tiles that changed last generation and their neighbors.
+
+        :return: A np.ndarray of bools, True for every tile to step
+        """
+
+        active = self.active
+
+        # Through the padding, the cells on an edge neighbor the cells on the opposite edge
+        if self.topology in ("torus", "klein"):
+            active = active.copy()
+            active[0] |= self.active[-1].any()
+            active[-1] |= self.active[0].any()
+            active[:, 0] |= self.active[:, -1]
+            active[:, -1] |= self.active[:, 0]
+
+        # Grow the active tiles by one tile in every direction
+        grown = active.copy()
+        grown[1:] |= active[:-1]
+        grown[:-1] |= active[1:]
+
+        stepped = grown.copy()
+        stepped[:, 1:] |= grown[:, :-1]
+        stepped[:, :-1] |= grown[:, 1:]
+
+        return stepped
+
+    @staticmethod
+    def runs(stepped: np.ndarray) -> Iterable[Tuple[int, int, int]]:
+        """
+        Merge neighboring stepped tiles in a row into runs, so they can be stepped in one go.
+
+        :param stepped: A np.ndarray of bools, True for every tile to step
+        :return: The tile row, first tile column and end tile column of every run
+        """
+
+        # Leave an idle column on either side, so every run has a start and an end
+        padded = np.zeros((stepped.shape[0], stepped.shape[1] + 2), dtype="int8")
+        padded[:, 1:-1] = stepped
+
+        # The runs start where a row goes from idle to stepped, and end where it goes back
+        edges = np.diff(padded, axis=1)
+        tile_rows, starts = np.nonzero(edges == 1)
+        _, stops = np.nonzero(edges == -1)
+
+        return zip(tile_rows.tolist(), starts.tolist(), stops.tolist())
+
+    def step_active(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Step the active tiles into the back buffer, and mark the tiles that changed as active for the next generation.
+        Every other tile is unchanged, so the back buffer already holds it, and the buffers can simply be swapped.
+        The board is stepped a band of tile rows at a time, through scratch arrays the size of a band.
+        A band that is mostly stepped is stepped whole, and its changes located, in one go,
+        the others a run of tiles at a time.
+
+        :return: The row and column indexes of the cells that changed, as two np.ndarrays
+        """
+
+        stepped = self.stepped_tiles()
+        band_tiles = self.counts.shape[0] // TILE_SIZE
+
+        changed_rows = []
+        changed_cols = []
+
+        for first in range(0, stepped.shape[0], band_tiles):
+            band = stepped[first:first + band_tiles]
+            tiles = self.active[first:first + band_tiles]
+
+            if not band.any():
+                tiles.fill(False)
+                continue
+
+            start = first * TILE_SIZE
+            stop = min(self.h, start + band.shape[0] * TILE_SIZE)
+
+            if band.mean() >= DENSE:
+                counts = self.counts[:stop - start]
+                self.step_region(slice(start, stop), slice(None), counts[:, :self.w], self.masks[:stop - start])
+
+                # The counts are 0 or 1, so they can be read as bools, which numpy locates the fastest
+                cells = np.flatnonzero(counts.view("bool"))
+                rows, cols = np.divmod(cells, counts.shape[1])
+                changed_rows.append(rows + start)
+                changed_cols.append(cols)
+
+                # The scratch is a whole number of tiles wide and high, its cells past the board cleared,
+                # so the changed tiles are found by folding the rows and then the columns of every tile together
+                counts = self.counts[:len(tiles) * TILE_SIZE]
+                counts[stop - start:] = 0
+                changed = np.logical_or.reduce(counts.view("bool").reshape(len(tiles), TILE_SIZE, -1), axis=1)
+                tiles[:] = changed.reshape(len(tiles), -1, TILE_SIZE).any(axis=2)
+                continue
+
+            tiles.fill(False)
+
+            for tile_row, tile_start, tile_stop in self.runs(band):
+                rows = slice(start + tile_row * TILE_SIZE, min(stop, start + (tile_row + 1) * TILE_SIZE))
+                cols = slice(tile_start * TILE_SIZE, min(self.w, tile_stop * TILE_SIZE))
+                counts = self.counts[:rows.stop - rows.start, cols]
+
+                self.step_region(rows, cols, counts, self.masks[:rows.stop - rows.start, cols])
+
+                rows, cols = np.nonzero(counts)
+                rows += start + tile_row * TILE_SIZE
+                cols += tile_start * TILE_SIZE
+                changed_rows.append(rows)
+                changed_cols.append(cols)
+
+                tiles[rows // TILE_SIZE - first, cols // TILE_SIZE] = True
+
+        if not changed_rows:
+            return np.zeros(0, dtype="intp"), np.zeros(0, dtype="intp")
+
+        return np.concatenate(changed_rows), np.concatenate(changed_cols)
+
+
+# The other engines live in their own files, and register themselves when imported
+import bitboard  # noqa: E402
+import chunks  # noqa: E402
+import hashlife  # noqa: E402
+import parallel  # noqa: E402
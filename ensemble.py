@@ -0,0 +1,275 @@
+"""
+This file contains the ensemble, which steps many independent boards of the same size at once.
+The boards are stacked into one 3-D array, so every generation is a single batched neighbor count and rule lookup,
+using the same kernels as the engines of the game.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import numpy as np
+from typing import Dict
+
+import rules
+
+# The states of a member of the ensemble, and their names as reported
+ACTIVE = 0
+DEAD = 1
+STABLE = 2
+STATES = ("active", "dead", "stable")
+
+
+class Ensemble:
+    def __init__(self, boards: np.ndarray, rule: str = rules.CONWAY, topology: str = "dead", history: int = 16):
+        """
+        Initialize an ensemble from a stack of boards.
+
+        :param boards: A np.ndarray of shape (n, h, w), where non-zero cells are alive
+        :param rule: The rule the boards are stepped by, as a rulestring in B/S notation
+        :param topology: What lies past the edges of the boards, one of rules.TOPOLOGIES
+        :param history: The amount of recent generations remembered, which bounds the longest period found
+        """
+
+        if topology not in rules.TOPOLOGIES:
+            raise ValueError(f"Unknown topology \"{topology}\", please use one of: {', '.join(rules.TOPOLOGIES)}")
+
+        n, h, w = boards.shape
+
+        self.rule = rule
+        self.topology = topology
+        self.lookup = rules.lookup_table(rule)
+        self.history = history
+
+        self.generation = 0
+
+        # The index every member had in the boards it was created from, which is kept as members are dropped
+        self.ids = np.arange(n)
+
+        # The state of every member still in the batch, and the state, generation and period of every finished one
+        self.states = np.full(n, ACTIVE, dtype="int8")
+        self.finished: Dict[int, dict] = {}
+
+        # Random odd weights of the 64 bit fingerprints, which tell the boards apart with next to no collisions
+        words = -(-h * -(-w // 8) // 8)
+        self.weights = np.random.default_rng(0).integers(0, 2 ** 63, words, dtype="uint64") * 2 + 1
+
+        # Each board has a one cell wide border, so the neighbor sums need no edge handling.
+        # The buffers are allocated once for every member, and the members still in the batch are kept at the front.
+        self.storage = [np.zeros((n, h + 2, w + 2), dtype="uint8") for _ in range(2)]
+        self.storage_counts = np.zeros((n, h, w), dtype="uint8")
+        self.storage_masks = np.zeros((n, h, w), dtype="uint16")
+
+        # The fingerprints and packed cells of the recent generations of every member, in a ring indexed by generation.
+        # The packed cells confirm a matching fingerprint, as two boards may share one.
+        self.storage_fingerprints = np.zeros((n, self.history), dtype="uint64")
+        self.storage_packed = np.zeros((n, self.history, words * 8), dtype="uint8")
+        self.generations = np.full(self.history, -1, dtype="int64")
+
+        self.front = 0
+        self.resize(n)
+
+        self.maps[0][:] = boards != 0
+        rules.wrap(self.buffers[0], self.topology)
+
+        packed = self.pack(self.boards)
+        self.fingerprints[:, 0] = self.fingerprint(packed)
+        self.packed[:, 0] = packed
+        self.generations[0] = 0
+
+    def resize(self, n: int):
+        """
+        Point the batch at the first n members of the buffers.
+
+        :param n: The amount of members in the batch
+        :return: None
+        """
+
+        self.buffers = [buffer[:n] for buffer in self.storage]
+        self.maps = [buffer[:, 1:-1, 1:-1] for buffer in self.buffers]
+        self.neighbor_views = [rules.neighbor_views(buffer) for buffer in self.buffers]
+
+        self.counts = self.storage_counts[:n]
+        self.masks = self.storage_masks[:n]
+
+        self.fingerprints = self.storage_fingerprints[:n]
+        self.packed = self.storage_packed[:n]
+
+    @classmethod
+    def soups(cls, n: int, w: int, h: int, density: float = 0.5, seed: int = None, **options) -> "Ensemble":
+        """
+        Create an ensemble of random soups.
+
+        :param n: The amount of boards
+        :param w: The width of the boards in cells
+        :param h: The height of the boards in cells
+        :param density: The fraction of live cells
+        :param seed: The seed of the soups, None picking one at random
+        :param options: The options of the ensemble, such as the rule and topology
+        :return: The ensemble
+        """
+
+        boards = np.random.default_rng(seed).random((n, h, w)) < density
+        return cls(boards.view("uint8"), **options)
+
+    @property
+    def boards(self) -> np.ndarray:
+        """
+        The current generation of the members still in the batch.
+
+        :return: A view of shape (n, h, w)
+        """
+
+        return self.maps[self.front]
+
+    def pack(self, boards: np.ndarray) -> np.ndarray:
+        """
+        Pack the cells of every board into bytes, padded to whole 64 bit words.
+
+        :param boards: A np.ndarray of shape (n, h, w)
+        :return: A np.ndarray of shape (n, bytes) of uint8
+        """
+
+        packed = np.packbits(boards, axis=-1).reshape(len(boards), -1)
+
+        # Pad the packed rows to whole words, so they can be viewed as such
+        words = np.zeros((len(boards), len(self.weights) * 8), dtype="uint8")
+        words[:, :packed.shape[1]] = packed
+
+        return words
+
+    def fingerprint(self, packed: np.ndarray) -> np.ndarray:
+        """
+        Fingerprint every board, by summing the 64 bit words of its packed cells with random weights.
+
+        :param packed: The packed boards, as given by pack
+        :return: A np.ndarray of n uint64 fingerprints
+        """
+
+        return (packed.view("uint64") * self.weights).sum(axis=1, dtype="uint64")
+
+    def step(self) -> np.ndarray:
+        """
+        Advance every member one generation, and find the members that have died out or stabilised.
+
+        :return: The state of every member still in the batch, as ACTIVE, DEAD or STABLE
+        """
+
+        rules.step(
+            self.neighbor_views[self.front],
+            self.maps[self.front],
+            self.maps[1 - self.front],
+            self.counts,
+            self.masks,
+            self.lookup
+        )
+
+        self.front = 1 - self.front
+        rules.wrap(self.buffers[self.front], self.topology)
+
+        self.generation += 1
+
+        return self.classify()
+
+    def advance(self, generations: int, drop: bool = True) -> int:
+        """
+        Advance the ensemble up to a number of generations, stopping early once every member has finished.
+
+        :param generations: The amount of generations to advance
+        :param drop: Whether to drop the finished members from the batch as they finish
+        :return: The amount of members still active
+        """
+
+        for _ in range(generations):
+            states = self.step()
+
+            if (states != ACTIVE).all():
+                break
+
+            if drop and (states != ACTIVE).any():
+                self.drop()
+
+        return int(np.count_nonzero(self.states == ACTIVE))
+
+    def classify(self) -> np.ndarray:
+        """
+        Look the fingerprints of the current generation up among the recent ones, recording the members that finished.
+        A member that is empty has died out, one that repeats a recent generation has stabilised with its period.
+
+        :return: The state of every member still in the batch, as ACTIVE, DEAD or STABLE
+        """
+
+        boards = self.maps[self.front]
+        packed = self.pack(boards)
+        fingerprints = self.fingerprint(packed)
+
+        dead = ~boards.any(axis=(1, 2))
+        matches = (self.fingerprints == fingerprints[:, None]) & (self.generations >= 0)
+
+        # The few matching fingerprints are confirmed by comparing the packed cells
+        members, slots = np.nonzero(matches)
+        matches[members, slots] = (self.packed[members, slots] == packed[members]).all(axis=1)
+
+        # The period is the distance to the most recent generation matched
+        ages = np.where(matches, self.generation - self.generations, self.history + 1).min(axis=1)
+        stable = ages <= self.history
+
+        # Only the members finishing this generation are recorded, as finished members stay finished
+        finishing = (self.states == ACTIVE) & (dead | stable)
+        self.states[finishing & stable] = STABLE
+        self.states[finishing & dead] = DEAD
+
+        for index in np.flatnonzero(finishing).tolist():
+            self.finished[int(self.ids[index])] = {
+                "state": STATES[self.states[index]],
+                "generation": self.generation,
+                "period": 1 if dead[index] else int(ages[index]),
+                "population": int(np.count_nonzero(boards[index]))
+            }
+
+        slot = self.generation % self.history
+        self.fingerprints[:, slot] = fingerprints
+        self.packed[:, slot] = packed
+        self.generations[slot] = self.generation
+
+        return self.states
+
+    def drop(self):
+        """
+        Drop the finished members from the batch, so they are no longer stepped.
+        The active members past the end of the shorter batch are moved into the places of the finished ones,
+        so dropping costs as much as the members dropped, and nothing is allocated.
+
+        :return: None
+        """
+
+        keep = self.states == ACTIVE
+        if keep.all():
+            return
+
+        n = int(np.count_nonzero(keep))
+        holes = np.flatnonzero(~keep[:n])
+        movers = np.flatnonzero(keep[n:]) + n
+
+        # Only the current generation and the history are moved, the other buffer is overwritten by the next step
+        self.buffers[self.front][holes] = self.buffers[self.front][movers]
+        self.fingerprints[holes] = self.fingerprints[movers]
+        self.packed[holes] = self.packed[movers]
+        self.ids[holes] = self.ids[movers]
+        self.states[holes] = self.states[movers]
+
+        self.ids = self.ids[:n]
+        self.states = self.states[:n]
+        self.resize(n)
+
+    def results(self) -> Dict[int, dict]:
+        """
+        Report every member, by the index it had in the boards the ensemble was created from.
+
+        :return: The state, generation, period and population of every finished member, and the state of the others
+        """
+
+        results = {
+            member: {"state": STATES[ACTIVE], "generation": self.generation}
+            for member, state in zip(self.ids.tolist(), self.states.tolist()) if state == ACTIVE
+        }
+        results.update(self.finished)
+
+        return dict(sorted(results.items()))
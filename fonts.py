@@ -4,10 +4,10 @@ It can be viewed like an oop container class, just without the class.
 """
 
 import pygame
-from screeninfo import get_monitors
+from window import primary_monitor
 
 # Scale fonts to the monitor size, to ensure continuity
-monitor = get_monitors()[0]
+monitor = primary_monitor()
 
 # Initialize the font module
 pygame.font.init()
@@ -3,13 +3,26 @@ This file contains just the game class, that can be instantiated with a window o
 All code related to the game of life is contained here.
 """
 
+import time
+import math
+import itertools
 import pygame
 import numpy as np
 from config import config
-from ui_elements import Button
+from ui_elements import Button, TextField
+from simulation import Simulation
+from worker import SimulationProcess
+from profiler import Profiler
+from stats import StatsLog
+from metrics import Metrics, MetricsServer
+from camera import Camera, ZOOMS
+from lod import Pyramid
 import fonts
 from typing import Tuple, Iterable
 
+# The most frames worth of time Speed+ lets turbo mode spend calculating the generations of one frame
+TURBO_BUDGET_LIMIT = 4.0
+
 
 class Game:
     def __init__(self, window):
@@ -26,13 +39,48 @@ class Game:
         self.animate_clock = pygame.time.Clock()
         self.animate_switch = False
 
-        # Calculate the cell width and height for rendering
-        self.cw = self.window.width // config.w
-        self.ch = self.window.height // config.h
+        # The camera pans and zooms over the board, starting out fitting it on the screen
+        self.camera = Camera(config.w, config.h, self.window.width, self.window.height)
+
+        # Whether the board is being dragged across the screen with the middle mouse button
+        self.dragging = False
+
+        # Zoomed out past a pixel per cell, the board is drawn from a pyramid of the live cells in ever larger blocks,
+        # and every block is shaded between the colors of dead and alive cells
+        self.pyramid = Pyramid(round(math.log2(1 / ZOOMS[0])))
+        shades = np.linspace(config.color_cell_dead, config.color_cell_alive, 256).round().astype("uint8")
+        self.shade_palette = [tuple(color) for color in shades.tolist()]
+
+        # The simulation owns the board and steps it, the game draws and edits its map.
+        # It runs in a worker process if config.worker_process is on, which then also writes the stats log.
+        options = dict(
+            engine=config.engine,
+            rule=config.rule,
+            topology=config.topology,
+            workers=config.workers,
+            hashlife_memory=config.hashlife_memory,
+            cycle_history=config.cycle_history,
+            trajectory_memory=config.trajectory_memory,
+            trajectory_directory=config.trajectory_directory,
+            trajectory_disk=config.trajectory_disk
+        )
+
+        if config.worker_process:
+            self.simulation = SimulationProcess(
+                config.w, config.h, stats_log=config.stats_log, frame_rate=config.frame_rate, **options
+            )
+        else:
+            self.simulation = Simulation(config.w, config.h, **options)
+
+        # The visible cells are drawn from 8-bit surfaces, whose palette maps the cells to the colors of dead and alive
+        # cells and the grid. The last color is the key, which the grid leaves see-through.
+        self.palette = [config.color_cell_dead, config.color_cell_alive, config.color_grid, config.color_bg]
+        self.cell_surface = None
+        self.scaled_surface = None
 
-        # Create the map from the config variables, and load the neigh_map
-        self.map: np.ndarray = np.zeros((config.h, config.w), dtype="bool")
-        self.neigh_map: list = [[self.get_neighbors(i, j) for j in range(config.w)] for i in range(config.h)]
+        # The pre-rendered frames of the animation, and the cell size, frame count and colors they were drawn for
+        self.sprites = []
+        self.sprite_key = None
 
         # Create the grid used to split the cells visually
         self.create_grid()
@@ -40,10 +88,21 @@ class Game:
         # Use a local game speed variable so we can update it without affecting the config
         self.game_speed = config.game_speed
 
+        # In turbo mode the frames are paced at config.frame_rate, and every frame calculates up to
+        # turbo_generations generations, or as many as fit in its budget if that is 0, rendering only the last.
+        # The budget is the part of a frame that may be spent on the generations.
+        self.turbo = config.turbo
+        self.turbo_generations = config.turbo_generations
+        self.turbo_budget = config.turbo_budget
+        self.turbo_rate = 0.0
+        self.turbo_time = 0.0
+
         # A variable that stores information about what to render, used by the render function
         self.draw_new = {
             "all": True,  # Flag to draw everything, is initially on for first render
-            "cells": []  # A list of cells to update
+            "cells": [],  # A list of cells to update
+            "whole": False,  # Flag to draw every visible cell at once, as more cells changed than are worth listing
+            "board": True  # Flag to count the whole board again when zoomed out, as it changed beyond the cells
         }
 
         self.buttons = []
@@ -102,13 +161,58 @@ class Game:
             "tr"
         ))
 
+        self.buttons.append(Button(
+            "jump",
+            fonts.main,
+            config.color_buttons,
+            self.jump,
+            self.window.scale_rect((820, 20, 180, 80)),
+            "tl"
+        ))
+
         # Live buttons holds all the buttons that are available while the game is running
-        self.live_buttons = self.buttons[3:6]
+        self.live_buttons = self.buttons[3:7]
 
         # Running is an object variable, so all functions can access it
         self.playing = False
         self.running = False
 
+        # The status of the board is shown in the gap between the buttons
+        self.hud_box = pygame.Rect(self.window.scale_rect((1005, 20, 510, 80)))
+        self.hud = TextField(self.status(), fonts.main, self.hud_box.center, text_color=config.color_text)
+
+        # A status wider than the HUD is wrapped onto a second line, below the first
+        self.hud_lines = [self.hud, TextField("", fonts.main, self.hud_box.center, text_color=config.color_text)]
+        self.hud_status = None
+
+        # The profiler times the phases of every frame, shown in an overlay toggled with F3
+        self.profiler = Profiler()
+        self.profile_box = pygame.Rect(self.window.scale_rect((20, 720, 620, 340)))
+        self.profile_lines = []
+        self.profile_time = 0
+
+        # The log every generation is recorded in, if one is set, and the time the last generation took
+        self.stats = StatsLog(config.stats_log) if config.stats_log and not self.simulation.remote else None
+        self.tick_seconds = 0.0
+
+        # The metrics scraped from a server on localhost, if a port is set
+        self.metrics = None
+        self.metrics_server = None
+
+        if config.metrics_port:
+            self.metrics = Metrics()
+            self.metrics_server = MetricsServer(self.metrics, config.metrics_port)
+
+    @property
+    def map(self) -> np.ndarray:
+        """
+        The map of the simulation, which is drawn and edited. In a worker process, it is the frame being drawn.
+
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        return self.simulation.map
+
     def exit(self):
         """
         Simple abstraction of stopping the game object
@@ -118,6 +222,21 @@ class Game:
 
         self.running = False
 
+    def close(self):
+        """
+        Close the simulation, stopping any workers it uses, and save the trajectories computed.
+
+        :return: None
+        """
+
+        self.simulation.close()
+
+        if self.stats is not None:
+            self.stats.close()
+
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+
     def clear(self):
         """
         Clear the map of marked cells
@@ -125,9 +244,9 @@ class Game:
         :return: None
         """
 
-        self.map: np.ndarray = np.zeros((config.h, config.w), dtype="bool")
-        self.refresh_neighbors()
+        self.simulation.clear()
         self.draw_new["all"] = True
+        self.draw_new["board"] = True
 
     def start(self):
         """
@@ -150,172 +269,683 @@ class Game:
         self.playing = False
         self.animate_switch = False
 
+    def jump(self):
+        """
+        Jump config.jump_generations generations ahead, using the HashLife engine.
+        The universe is unbounded while jumping, so cells that leave the map are cut off afterwards.
+
+        :return: None
+        """
+
+        if self.simulation.jump(config.jump_generations):
+            self.draw_new["all"] = True
+            self.draw_new["board"] = True
+
     def speed_up(self):
-        self.game_speed *= 1.1
+        """
+        Speed the game up, by pacing the generations faster, or in turbo mode by doubling the generations per frame.
+        Without a limit on the generations per frame, the budget of the frame is raised instead,
+        up to TURBO_BUDGET_LIMIT frames, so more generations fit in a frame at the cost of the frame rate.
+
+        :return: None
+        """
+
+        if not self.turbo:
+            self.game_speed *= 1.1
+        elif self.turbo_generations:
+            self.turbo_generations *= 2
+        else:
+            self.turbo_budget = min(TURBO_BUDGET_LIMIT, self.turbo_budget * 1.25)
+
+        self.pace()
 
     def speed_down(self):
-        self.game_speed /= 1.1
+        """
+        Slow the game down, by pacing the generations slower, or in turbo mode by halving the generations per frame.
+        Without a limit on the generations per frame, a budget raised by speed_up is lowered back first,
+        after which the limit starts from half of what the last frame managed.
+
+        :return: None
+        """
+
+        if not self.turbo:
+            self.game_speed /= 1.1
+        elif not self.turbo_generations and self.turbo_budget > config.turbo_budget:
+            self.turbo_budget = max(config.turbo_budget, self.turbo_budget / 1.25)
+        else:
+            generations = self.turbo_generations or self.turbo_rate / config.frame_rate
+            self.turbo_generations = max(1, int(generations) // 2)
+
+        self.pace()
 
-    def get_neighbors(self, i: int, j: int) -> np.ndarray:
+    def toggle_turbo(self):
         """
-        Get the neighbors of a particular cell, taking the borders into account.
-        :param i: Columns, the first index of the grid
-        :param j: Rows, the second index of the grid
-        :return: A np.ndarray of max 3x3, tied to self.map
+        Switch turbo mode on or off.
+
+        :return: None
         """
 
-        return self.map[max(0, i - 1): min(config.h - 1, i + 2), max(0, j - 1): min(config.w - 1, j + 2)]
+        self.turbo = not self.turbo
+        self.turbo_rate = 0.0
+        self.turbo_time = time.perf_counter()
+
+        self.pace()
+
+    def rate(self) -> float:
+        """
+        The generations per second a worker process runs at, 0 being as fast as it can.
+
+        :return: The rate
+        """
+
+        if not self.turbo:
+            return self.game_speed
+
+        return self.turbo_generations * config.frame_rate
 
-    def refresh_neighbors(self):
+    def pace(self):
         """
-        Refresh the neighbor map, is used to quickly calculate the sum of neighbors.
+        Tell a running worker process the rate to run at, after the speed or mode changed.
+
         :return: None
         """
 
-        self.neigh_map: list = [[self.get_neighbors(i, j) for j in range(config.w)] for i in range(config.h)]
+        if self.simulation.remote and self.simulation.running:
+            self.simulation.set_rate(self.rate())
 
-    def get_neighbors_sum(self, i: int, j: int) -> int:
+    def game_tick(self, mark: bool = True) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Get the sum of all neighbors, including the cell itself.
-        :param i: Columns, the first index of the grid
-        :param j: Rows, the second index of the grid
-        :return: The integer sum of all neighbors
+        Calculate the next tick in the game, which the simulation steps the map to.
+        :param mark: Whether to mark the changed cells for the render function
+        :return: The row and column indexes of the cells that changed, as two np.ndarrays
         """
 
-        return int(np.sum(self.neigh_map[i][j]))
+        start = time.perf_counter()
+        rows, cols = self.simulation.tick()
+        self.tick_seconds = time.perf_counter() - start
+
+        self.profiler.record("tick", self.tick_seconds)
+        self.profiler.count("generation")
+
+        if self.metrics is not None:
+            self.metrics.tick(self.tick_seconds, self.simulation.generation, self.simulation.population)
+
+        # Mark the changed cells, so the render function can update them selectively
+        if mark:
+            self.draw_new["cells"].extend(zip(rows.tolist(), cols.tolist()))
 
-    def game_tick(self):
+        return rows, cols
+
+    def turbo_tick(self):
         """
-        Calculate the next tick in the game.
-        This means creating a new board, and filling all cells based on the rules of the game of life.
+        Calculate the generations of one frame in turbo mode, stopping at turbo_generations,
+        or once turbo_budget of the frame has been spent, so the frame rate holds.
+        Only the cells that differ after all of them are marked for the render function.
+
         :return: None
         """
-        new_board = np.zeros((config.h, config.w), dtype="bool")
 
-        for i in range(config.h):
-            for j in range(config.w):
-                if self.map[i, j]:  # Cell is alive
-                    if not 2 < self.get_neighbors_sum(i, j) < 5:  # Cell dies by over-/underpopulation
-                        new_board[i, j] = 0
-                        self.draw_new["cells"].append((i, j))
-                    else:
-                        new_board[i, j] = 1
+        before = self.map.copy()
+        deadline = time.perf_counter() + self.turbo_budget / config.frame_rate
 
-                else:  # Cell is dead
-                    if self.get_neighbors_sum(i, j) == 3:  # Cell lives by reproduction
-                        new_board[i, j] = 1
-                        self.draw_new["cells"].append((i, j))
-                    else:
-                        new_board[i, j] = 0
+        generations = 0
+        while not self.turbo_generations or generations < self.turbo_generations:
+            self.game_tick(False)
+            self.record_generation()
+            generations += 1
+
+            if time.perf_counter() >= deadline:
+                break
+
+        rows, cols = np.nonzero(self.map != before)
+        self.draw_new["cells"].extend(zip(rows.tolist(), cols.tolist()))
+
+        self.measure_rate(generations)
+
+    def measure_rate(self, generations: int):
+        """
+        Measure the generations per second shown in the HUD, smoothed over the recent frames so it stays readable.
+
+        :param generations: The generations calculated since the last frame
+        :return: None
+        """
+
+        now = time.perf_counter()
+        if now > self.turbo_time:
+            rate = generations / (now - self.turbo_time)
+            self.turbo_rate = rate if not self.turbo_rate else 0.8 * self.turbo_rate + 0.2 * rate
+        self.turbo_time = now
+
+    def receive_frame(self, pause: bool = False):
+        """
+        Pick up the newest frame of the worker process, if there is a new one, and render it without animating.
+        The worker runs at its own pace, so the frame may be several generations ahead of the last.
+
+        :param pause: Whether to pause the worker first, picking up the last frame it calculated
+        :return: None
+        """
+
+        generation = self.simulation.generation
+        changed = self.simulation.pause() if pause else self.simulation.poll()
+
+        # Without a new frame, the view is only redrawn if it was moved
+        if changed is None:
+            if self.draw_new["all"]:
+                self.render()
+            return
+
+        # A frame may be many generations ahead, with much of the board changed.
+        # Listing that many cells would cost more than drawing the view, and counting the board again, as a whole.
+        rows, cols = changed
+        if len(rows) > self.map.size // 128:
+            self.draw_new["whole"] = True
+            self.draw_new["board"] = True
+        else:
+            self.draw_new["cells"].extend(zip(rows.tolist(), cols.tolist()))
+
+        generations = max(0, self.simulation.generation - generation)
+        self.measure_rate(generations)
+
+        self.profiler.count("generation", generations)
+
+        if self.metrics is not None:
+            self.metrics.tick(
+                self.simulation.tick_seconds, self.simulation.generation, self.simulation.population, generations
+            )
+
+        animate_switch = self.animate_switch
+        self.animate_switch = False
+        self.render_generation(False)
+        self.animate_switch = animate_switch
+
+    def render_generation(self, record: bool = True):
+        """
+        Render the generation just calculated, and record it in the stats log and metrics, if they are set.
+
+        :param record: Whether to record the generation in the stats log, which turbo mode does as it calculates them
+        :return: None
+        """
+
+        start = time.perf_counter()
+        self.render()
+        render_seconds = time.perf_counter() - start
+
+        if self.metrics is not None:
+            self.metrics.render(render_seconds)
+
+        if record:
+            self.record_generation(render_seconds)
+
+    def record_generation(self, render_seconds: float = None):
+        """
+        Record the generation just calculated in the stats log, if one is set.
+
+        :param render_seconds: The time it took to render, None if it was not rendered
+        :return: None
+        """
+
+        if self.stats is not None:
+            self.stats.write(
+                self.simulation.generation,
+                self.simulation.population,
+                self.simulation.births,
+                self.simulation.deaths,
+                self.tick_seconds,
+                render_seconds
+            )
+
+    def status(self) -> str:
+        """
+        Describe the state of the board, for the HUD.
+
+        :return: The generation, or the period and start of the cycle once the board repeats itself,
+                 and the rate in turbo mode
+        """
+
+        if self.playing and (self.turbo or self.simulation.remote):
+            return f"{self.simulation.status()} @ {self.turbo_rate:.0f}/s"
+
+        return self.simulation.status()
+
+    def render_hud(self, rects: list):
+        """
+        Draw the status of the board, if it changed or anything was drawn over it.
+
+        :param rects: The rects drawn this frame, which the HUD rect is added to when drawn
+        :return: None
+        """
+
+        status = self.status()
+
+        if status == self.hud_status and not self.draw_new["all"] and self.hud_box.collidelist(rects) == -1:
+            return
+
+        self.hud_status = status
+
+        # Break the status before the last word that still fits on the first line
+        words = status.split(" ")
+        split = len(words)
+        while split > 1 and fonts.main.size(" ".join(words[:split]))[0] > self.hud_box.width:
+            split -= 1
+
+        lines = [" ".join(words[:split]), " ".join(words[split:])]
+        x, y = self.hud_box.center
+        offset = self.hud_box.height // 4 if lines[1] else 0
+
+        pygame.draw.rect(self.window.window, config.color_bg, self.hud_box)
+
+        for line, text, line_y in zip(self.hud_lines, lines, (y - offset, y + offset)):
+            line.text = text
+            line.pos = (x, line_y)
+            line.render(self.window.window, True)
+
+        rects.append(self.hud_box)
+
+    def toggle_profile(self):
+        """
+        Show or hide the performance overlay, enabling the profiler only while it is shown.
+
+        :return: None
+        """
+
+        self.profiler.enabled = not self.profiler.enabled
+        self.profiler.reset()
+
+        # Hiding the overlay leaves the cells below it to be redrawn
+        self.draw_new["all"] = True
+
+    def render_profile(self, rects: list):
+        """
+        Draw the performance overlay, if it is shown. Its text is refreshed a few times a second,
+        and redrawn every frame, as the cells below it may have been drawn over it.
+
+        :param rects: The rects drawn this frame, which the overlay rect is added to
+        :return: None
+        """
+
+        if not self.profiler.enabled:
+            return
 
-        # Overwrite the current map
-        self.map = new_board
-        # Refresh the neigh_map, which is immutably tied to the board
-        self.refresh_neighbors()
+        now = pygame.time.get_ticks()
+
+        if now - self.profile_time >= 250:
+            self.profile_time = now
+            snapshot = self.profiler.snapshot()
+
+            text = [
+                f"{snapshot['generations_per_second']:.1f} gen/s  {snapshot['frames_per_second']:.1f} fps",
+                "phase  p50 / p95 / max ms"
+            ]
+            text.extend(
+                f"{name}  {p['p50'] * 1000:.2f} / {p['p95'] * 1000:.2f} / {p['max'] * 1000:.2f}"
+                for name, p in snapshot["phases"].items()
+            )
+
+            self.profile_lines = [fonts.main.render(line, True, config.color_text) for line in text]
+
+        pygame.draw.rect(self.window.window, config.color_bg, self.profile_box)
+
+        y = self.profile_box.y + 10
+        for line in self.profile_lines:
+            self.window.blit(line, (self.profile_box.x + 10, y))
+            y += line.get_height()
+
+        rects.append(self.profile_box)
 
     # noinspection PyAttributeOutsideInit
     def create_grid(self):
         """
-        This function draws the grid that will be used to split the cells visually.
-        It uses the Surface.convert_alpha and pygame.SRCALPHA to create the transparent squares.
+        This function draws the grid that will be used to split the cells visually, at the zoom of the camera.
+        It covers the screen and one more cell, so it can be shifted along with the board while panning.
+        It is an 8-bit surface with the palette of the cells, the pixels between the lines being the see-through key.
+        :return: None
+        """
+
+        size = self.camera.size
+        self.grid_size = size
+
+        # Small cells are drawn without a grid, as it would cover them
+        if not self.camera.grid:
+            self.grid = None
+            return
+
+        columns = self.window.width // size + 2
+        rows = self.window.height // size + 2
+
+        self.grid = pygame.Surface((columns * size, rows * size), depth=8)
+        self.grid.set_palette(self.palette)
+
+        # The lines run along the first two and the last pixel of every cell, leaving the rect the cells are drawn in
+        xs = np.arange(columns * size) % size
+        ys = np.arange(rows * size) % size
+        lines_x = (xs < 2) | (xs == size - 1)
+        lines_y = (ys < 2) | (ys == size - 1)
+
+        pixels = pygame.surfarray.pixels2d(self.grid)
+        pixels[:] = np.where(lines_x[:, None] | lines_y[None, :], 2, 3)
+        del pixels
+
+        self.grid.set_colorkey(3)
+
+    def move_view(self):
+        """
+        Redraw everything after the camera moved, creating the grid again if the zoom changed.
+
         :return: None
         """
-        self.grid = pygame.Surface((self.window.width, self.window.height), pygame.SRCALPHA)
 
-        for i, j in np.ndindex(self.map.shape):
-            rect = (self.cw * j, self.ch * i, self.cw, self.ch)
-            pygame.draw.rect(self.grid, config.color_grid, rect, 2)
+        if self.grid_size != self.camera.size:
+            self.create_grid()
+
+        self.draw_new["all"] = True
+
+    def handle_view(self, event) -> bool:
+        """
+        Pan and zoom the camera. W, A, S and D pan, + and - zoom, and Home fits the board on the screen again,
+        while the scroll wheel zooms around the cursor and dragging with the middle mouse button pans.
+
+        :param event: The pygame event
+        :return: Whether the event was used by the camera
+        """
+
+        camera = self.camera
+
+        if event.type == pygame.MOUSEWHEEL:
+            camera.zoom(event.y, *pygame.mouse.get_pos())
+
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 2:
+            self.dragging = True
+            return True
+
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 2:
+            self.dragging = False
+            return True
+
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            camera.pan(*event.rel)
+
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s):
+            # Every press pans an eighth of the screen, moving the view the way of the key
+            dx = {pygame.K_a: 1, pygame.K_d: -1}.get(event.key, 0)
+            dy = {pygame.K_w: 1, pygame.K_s: -1}.get(event.key, 0)
+            camera.pan(dx * self.window.width // 8, dy * self.window.height // 8)
+
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            camera.zoom(1, self.window.width // 2, self.window.height // 2)
+
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            camera.zoom(-1, self.window.width // 2, self.window.height // 2)
+
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+            camera.fit()
+
+        else:
+            return False
+
+        self.move_view()
+        return True
+
+    def visible_cells(self) -> list:
+        """
+        Find the cells to draw this frame: the marked cells on the screen, or every cell on it if "all" is on.
+
+        :return: The row and column of every cell to draw
+        """
+
+        rows, cols = self.camera.visible()
+
+        if self.draw_new["all"]:
+            shape = (rows.stop - rows.start, cols.stop - cols.start)
+            return [(i + rows.start, j + cols.start) for i, j in np.ndindex(shape)]
+
+        return [
+            (i, j) for i, j in self.draw_new["cells"]
+            if rows.start <= i < rows.stop and cols.start <= j < cols.stop
+        ]
+
+    def cell_rect(self, i: int, j: int) -> Tuple[int, int, int, int]:
+        """
+        Find the rect a cell is drawn in, inside the grid if it is drawn.
+
+        :param i: The row of the cell
+        :param j: The column of the cell
+        :return: The rect in pixels
+        """
+
+        x, y = self.camera.position(i, j)
+        size = self.camera.size
+
+        if self.grid is not None:
+            return x + 2, y + 2, size - 3, size - 3
+
+        return x, y, size, size
+
+    def render_cells(self) -> Tuple[int, int, int, int]:
+        """
+        Draw every visible cell at once. The cells are copied into an 8-bit surface with a pixel per cell,
+        which is scaled up to the size of the cells with the grid blitted over it, and blitted to the screen in one go.
+
+        :return: The rect drawn
+        """
+
+        rows, cols = self.camera.visible()
+        size = self.camera.size
+
+        x, y = self.camera.position(rows.start, cols.start)
+        shape = (cols.stop - cols.start, rows.stop - rows.start)
+        scaled = (shape[0] * size, shape[1] * size)
+
+        if not shape[0] or not shape[1]:
+            return x, y, 0, 0
+
+        # The surfaces are kept between frames, and only made again when the view changes size
+        if self.cell_surface is None or self.cell_surface.get_size() != shape:
+            self.cell_surface = pygame.Surface(shape, depth=8)
+            self.cell_surface.set_palette(self.palette)
+
+        if self.scaled_surface is None or self.scaled_surface.get_size() != scaled:
+            self.scaled_surface = pygame.Surface(scaled, depth=8)
+            self.scaled_surface.set_palette(self.palette)
+
+        # Surfarray takes the pixels column by column, so the cells are transposed
+        pygame.surfarray.blit_array(self.cell_surface, self.map[rows, cols].T)
+        pygame.transform.scale(self.cell_surface, scaled, self.scaled_surface)
+
+        # The grid starts at a cell boundary, just like the scaled cells
+        if self.grid is not None:
+            self.scaled_surface.blit(self.grid, (0, 0))
+
+        self.window.blit(self.scaled_surface, (x, y))
+
+        return x, y, scaled[0], scaled[1]
+
+    def render_lod(self) -> Tuple[int, int, int, int]:
+        """
+        Draw the visible cells when zoomed out past a pixel per cell, from the pyramid level with a block per pixel.
+        Only the blocks holding the marked cells are counted again, so drawing costs the same however large the board.
+
+        :return: The rect drawn
+        """
 
-        self.grid = self.grid.convert_alpha()
+        cells = self.draw_new["cells"]
+
+        # Once a large part of the board changed, counting every block again is quicker than finding the changed ones
+        if self.draw_new["board"] or not self.pyramid.levels or len(cells) > self.map.size // 128:
+            self.pyramid.build(self.map)
+        elif cells:
+            changed = np.fromiter(itertools.chain.from_iterable(cells), dtype="intp", count=len(cells) * 2)
+            self.pyramid.update(self.map, changed[0::2], changed[1::2])
+
+        rows, cols = self.camera.visible()
+        depth = round(math.log2(1 / self.camera.size))
+
+        shades = self.pyramid.shades(depth, rows, cols, config.zoom_shading)
+
+        # The window of blocks starts at the block holding the first visible cell
+        x, y = self.camera.position(rows.start >> depth << depth, cols.start >> depth << depth)
+
+        if not shades.size:
+            return x, y, 0, 0
+
+        # Surfarray takes the pixels column by column, so the shades are transposed.
+        # They make an 8-bit surface, which the palette colors as it is blitted.
+        surface = pygame.surfarray.make_surface(shades.T)
+        surface.set_palette(self.shade_palette)
+        self.window.blit(surface, (x, y))
+
+        return x, y, surface.get_width(), surface.get_height()
 
     def render(self):
         """
-        The main render function, featuring the animation and selective updating
+        The main render function, featuring the animation and selective updating.
+        Only the cells visible through the camera are drawn.
         :return: None
         """
 
-        # Fill the screen and draw the grid if "all" is on
+        # Fill the screen if "all" is on
         if self.draw_new["all"]:
             self.window.fill(config.color_bg)
-            self.window.blit(self.grid, (0, 0))
 
-        # Calculate the amount the rects change per frame
-        ani_diff_w = (self.cw - 3) / config.animate_count / 2
-        ani_diff_h = (self.ch - 3) / config.animate_count / 2
+        # Redrawing everything, or many cells, every visible cell is drawn at once, otherwise the marked cells one by one
+        rows, cols = self.camera.visible()
+        visible = (rows.stop - rows.start) * (cols.stop - cols.start)
+        whole = (
+            self.draw_new["all"] or self.draw_new["whole"] or self.camera.size < 1
+            or len(self.draw_new["cells"]) > visible // 16
+        )
 
-        # If animating is enabled, animate the cells dying and reproducing
-        if self.animate_switch and config.animate_master:
-            # Split the rendering into self.ani_count steps
-            for n in range(config.animate_count):
-                rects = []
+        animating = self.animate_switch and config.animate_master and self.grid is not None
+        cells = self.visible_cells() if animating or not whole else []
 
-                # Iterate through marked cells, or all cells if "all" flag is on
-                for i, j in self.draw_new["cells"] if not self.draw_new["all"] else np.ndindex(self.map.shape):
-                    full_rect = (self.cw * j + 2, self.ch * i + 2, self.cw - 3, self.ch - 3)
+        # If animating is enabled, animate the cells dying and reproducing, when they are large enough to
+        if animating:
+            with self.profiler.phase("animate"):
+                self.animate(cells)
 
-                    if self.map[i, j]:
-                        # Define the rect to draw, taking into account the frame of animation
-                        rect = (
-                            self.cw * j + 3 + ani_diff_w * (config.animate_count - n),
-                            self.ch * i + 3 + ani_diff_h * (config.animate_count - n),
-                            self.cw - 3 - ani_diff_w * (config.animate_count - n) * 2,
-                            self.ch - 3 - ani_diff_h * (config.animate_count - n) * 2
-                        )
+        with self.profiler.phase("draw"):
+            rects = []
+
+            # Zoomed out past a pixel per cell, the cells can not be drawn one by one, so the view is drawn as a whole
+            if self.camera.size < 1:
+                rects.append(self.render_lod())
+
+            elif whole:
+                rects.append(self.render_cells())
+
+            else:
+                # Draw the completed scene one more time, to ensure continuity with actual game
+                for i, j in cells:
+                    rect = self.cell_rect(i, j)
 
+                    if self.map[i, j]:
                         pygame.draw.rect(self.window.window, config.color_cell_alive, rect)
-                        rects.append(rect)
                     else:
-                        # Similarly define the rect, just the opposite of the expanding rect
-                        rect = (
-                            self.cw * j + 3 + ani_diff_w * n,
-                            self.ch * i + 3 + ani_diff_h * n,
-                            self.cw - 3 - ani_diff_w * n * 2,
-                            self.ch - 3 - ani_diff_h * n * 2
-                        )
-
-                        # Draw both the surrounding rect to remove the white, then draw the new rect
-                        pygame.draw.rect(self.window.window, config.color_cell_dead, full_rect)
-                        pygame.draw.rect(self.window.window, config.color_cell_alive, rect)
-                        rects.append(full_rect)
+                        pygame.draw.rect(self.window.window, config.color_cell_dead, rect)
+
+                    rects.append(rect)
 
-                # Detect overlap for the buttons, and correct by redrawing
-                if self.detect_overlap(rects):
-                    for button in self.buttons:
-                        button.render(self.window.window)
-                        rects.append(button)
+            # Detect overlap for the buttons, and correct by redrawing
+            if self.draw_new["all"] or self.detect_overlap(rects):
+                for button in self.buttons:
+                    button.render(self.window.window)
+                    rects.append(button)
 
-                # Update the rects that have been drawn to, then sync the framerate of the animation
+            self.render_hud(rects)
+            self.render_profile(rects)
+
+        # Update part of the image, if "all" flag is on, update the whole
+        with self.profiler.phase("update"):
+            if self.draw_new["all"]:
+                self.window.update()
+            else:
                 self.window.update(rects)
-                self.animate_clock.tick(self.game_speed * config.animate_count * config.animate_speed)
 
-        rects = []
+        # Reset the per-frame parameters. The pyramid is only kept up while zoomed out, so it is counted again after.
+        self.draw_new["all"] = False
+        self.draw_new["whole"] = False
+        self.draw_new["cells"].clear()
+        self.draw_new["board"] = self.camera.size >= 1
 
-        # Draw the completed scene one more time, to ensure continuity with actual game
-        for i, j in self.draw_new["cells"] if not self.draw_new["all"] else np.ndindex(self.map.shape):
-            rect = (self.cw * j + 2, self.ch * i + 2, self.cw - 3, self.ch - 3)
+        self.profiler.count("frame")
 
-            if self.map[i, j]:
-                pygame.draw.rect(self.window.window, config.color_cell_alive, rect)
-            else:
-                pygame.draw.rect(self.window.window, config.color_cell_dead, rect)
+    def animation_sprites(self) -> list:
+        """
+        Get the frames of a cell coming alive or dying, pre-rendered for the current cell size, animation and colors.
+        Frame k has the live square inset by k steps, so a cell coming alive plays the frames backwards.
+        They are drawn again whenever any of those change, such as when the camera zooms.
 
-            rects.append(rect)
+        :return: The frames, as pygame.Surfaces the size of the rect a cell is drawn in
+        """
 
-        # Detect overlap for the buttons, and correct by redrawing
-        if self.detect_overlap(rects):
-            for button in self.buttons:
-                button.render(self.window.window)
-                rects.append(button)
+        size = self.camera.size
+        key = (size, config.animate_count, tuple(config.color_cell_alive), tuple(config.color_cell_dead))
 
-        # Update part of the image, if "all" flag is on, update the whole
-        if self.draw_new["all"]:
-            self.window.update()
-        else:
-            self.window.update(rects)
+        if key == self.sprite_key:
+            return self.sprites
 
-        # Reset the per-frame parameters
-        self.draw_new["all"] = False
-        self.draw_new["cells"].clear()
+        # Calculate the amount the rects change per frame
+        ani_diff = (size - 3) / config.animate_count / 2
+
+        self.sprites = []
+        for k in range(config.animate_count + 1):
+            sprite = pygame.Surface((size - 3, size - 3))
+            sprite.fill(config.color_cell_dead)
+
+            # The live square, relative to the rect the cell is drawn in
+            rect = (1 + ani_diff * k, 1 + ani_diff * k, size - 3 - ani_diff * k * 2, size - 3 - ani_diff * k * 2)
+            pygame.draw.rect(sprite, config.color_cell_alive, rect)
+
+            self.sprites.append(sprite.convert())
+
+        self.sprite_key = key
+        return self.sprites
+
+    def animate(self, cells: list):
+        """
+        Animate the marked cells dying and reproducing, over config.animate_count frames.
+        Every frame blits the pre-rendered sprite of every cell in one call.
+        :param cells: The row and column of every cell to animate
+        :return: None
+        """
+
+        if not cells:
+            return
+
+        count = config.animate_count
+        sprites = self.animation_sprites()
+
+        # The rects the cells are drawn in, and whether they are coming alive, are the same in every frame
+        rects = [self.cell_rect(i, j) for i, j in cells]
+        alive = self.map[tuple(np.array(cells).T)].tolist()
+        overlap = self.detect_overlap(rects)
+
+        # Pygame-ce blits a sequence fastest with fblits, pygame with blits when not asked for the rects
+        screen = self.window.window
+        fblits = getattr(screen, "fblits", None)
+
+        # Split the rendering into self.ani_count steps
+        for n in range(count):
+            # A cell coming alive grows its square, a dying cell shrinks it
+            born = sprites[count - n]
+            died = sprites[n]
+            sequence = [(born if a else died, rect[:2]) for a, rect in zip(alive, rects)]
+
+            if fblits is not None:
+                fblits(sequence)
+            else:
+                screen.blits(sequence, False)
+
+            frame_rects = rects
+
+            # Detect overlap for the buttons, and correct by redrawing
+            if overlap:
+                frame_rects = rects + self.buttons
+                for button in self.buttons:
+                    button.render(screen)
+
+            # Update the rects that have been drawn to, then sync the framerate of the animation
+            self.window.update(frame_rects)
+            self.animate_clock.tick(self.game_speed * count * config.animate_speed)
 
     def detect_overlap(self, rects: Iterable[Tuple[int, int, int, int]]) -> bool:
         """
@@ -327,7 +957,7 @@ class Game:
 
         return any(
             rect[1] < self.window.scale_y(105) and
-            (rect[0] < self.window.scale_x(805) or rect[0] + rect[2] > self.window.scale_x(1515))
+            (rect[0] < self.window.scale_x(1005) or rect[0] + rect[2] > self.window.scale_x(1515))
             for rect in rects
         )
 
@@ -351,14 +981,41 @@ class Game:
         self.playing = True
         self.render()
 
+        self.turbo_time = time.perf_counter()
+
+        # A worker process runs on its own, and the frames it publishes are drawn as they come in, unanimated
+        if self.simulation.remote:
+            self.simulation.run(self.rate())
+
         while self.playing:
             # update the game, sync the framerate and render the scene
-            self.game_tick()
-            self.clock.tick(self.game_speed)
-            self.render()
+            if self.simulation.remote:
+                self.receive_frame()
+                self.clock.tick(config.frame_rate)
+
+            elif self.turbo:
+                self.turbo_tick()
+                self.clock.tick(config.frame_rate)
+
+                # Animating only the last of many generations would just slow the frame down
+                animate_switch = self.animate_switch
+                self.animate_switch = False
+                self.render_generation(False)
+                self.animate_switch = animate_switch
+            else:
+                self.game_tick()
+                self.clock.tick(self.game_speed)
+                self.render_generation()
+
+            with self.profiler.phase("events"):
+                events = pygame.event.get()
 
             # Iterate through the events pygame collected
-            for event in pygame.event.get():
+            for event in events:
+                # Panning and zooming works while the game runs, too
+                if self.handle_view(event):
+                    continue
+
                 if event.type == pygame.KEYDOWN:
                     # If user presses escape, stop running the game
                     if event.key == pygame.K_ESCAPE:
@@ -377,10 +1034,26 @@ class Game:
                         self.game_tick()
 
                         # Disable the animation, and quickly render the next frame
+                        self.animate_switch = False
+                        self.render_generation()
+                        self.animate_switch = True
+
+                    # Jump many generations forward, without animating
+                    elif event.key == pygame.K_j:
+                        self.jump()
+
                         self.animate_switch = False
                         self.render()
                         self.animate_switch = True
 
+                    # Show or hide the performance overlay
+                    elif event.key == pygame.K_F3:
+                        self.toggle_profile()
+
+                    # Switch turbo mode on or off
+                    elif event.key == pygame.K_t:
+                        self.toggle_turbo()
+
                 # If the user has pressed mouse-button up
                 if event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1:
@@ -392,6 +1065,10 @@ class Game:
                             if button.collidepoint(x, y):
                                 button.callback()
 
+        # The worker is paused once the game stops, and the last frame it calculated is drawn
+        if self.simulation.remote:
+            self.receive_frame(True)
+
     # The main function that triggers when the game starts
     def run(self):
         """
@@ -405,8 +1082,15 @@ class Game:
         while self.running:
             self.render()
 
+            with self.profiler.phase("events"):
+                events = pygame.event.get()
+
             # Iterate through the event pygame has collected
-            for event in pygame.event.get():
+            for event in events:
+                # Pan and zoom the board
+                if self.handle_view(event):
+                    continue
+
                 if event.type == pygame.KEYDOWN:
                     # If the user has pressed escape, close the game
                     if event.key == pygame.K_ESCAPE:
@@ -428,6 +1112,18 @@ class Game:
                     elif event.key == pygame.K_q:
                         self.clear()
 
+                    # If the player presses j, jump many generations forward
+                    elif event.key == pygame.K_j:
+                        self.jump()
+
+                    # If the player presses F3, show or hide the performance overlay
+                    elif event.key == pygame.K_F3:
+                        self.toggle_profile()
+
+                    # If the player presses t, switch turbo mode on or off
+                    elif event.key == pygame.K_t:
+                        self.toggle_turbo()
+
                 # If the user has pressed mouse-button up
                 if event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1:
@@ -442,12 +1138,11 @@ class Game:
             # Get the x and y position of the mouse, and calculate the indexes of the map
             x, y = pygame.mouse.get_pos()
 
-            # We need to check and make sure, that the cursor isn't on top of the buttons
-            if not self.on_buttons(x, y):
+            # We need to check and make sure, that the cursor isn't on top of the buttons, or dragging the board
+            if not self.on_buttons(x, y) and not self.dragging:
                 buttons = pygame.mouse.get_pressed()
 
-                i = y // self.ch
-                j = x // self.cw
+                i, j = self.camera.cell_at(x, y)
 
                 # Only continue if the mouse is inside the map
                 if 0 <= i < config.h and 0 <= j < config.w:
@@ -455,10 +1150,12 @@ class Game:
                     if buttons[0]:
                         if not self.map[i, j]:
                             self.map[i, j] = 1
+                            self.simulation.edited = True
                             self.draw_new["cells"].append((i, j))
 
                     # If right mouse-button has been pressed, mark the cell as dead
                     elif buttons[2]:
                         if self.map[i, j]:
                             self.map[i, j] = 0
+                            self.simulation.edited = True
                             self.draw_new["cells"].append((i, j))
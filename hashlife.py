@@ -0,0 +1,455 @@
+"""
+This file contains a HashLife engine, used to fast-forward the game by large amounts of generations.
+The board is stored as a quadtree of canonical nodes, and the result of advancing each node is memoized,
+so regular patterns such as guns and oscillators can be jumped through in exponentially large steps.
+"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+from engines import Engine, register
+
+
+# A rough estimate of the memory used by one node, including its table and memo entries
+NODE_BYTES = 400
+
+# The level of the nodes whose live cells are looked up as a whole, rather than walked cell by cell
+LEAF_LEVEL = 3
+
+
+class Node:
+    __slots__ = ("nw", "ne", "sw", "se", "level", "pop")
+
+    def __init__(self, nw, ne, sw, se, level: int, pop: int):
+        """
+        A node of the quadtree, covering a square of 2^level cells.
+        Nodes should only be created through HashLife.join, which ensures they are canonical.
+
+        :param nw: The north-west quadrant
+        :param ne: The north-east quadrant
+        :param sw: The south-west quadrant
+        :param se: The south-east quadrant
+        :param level: The level of the node, where level 0 is a single cell
+        :param pop: The amount of live cells in the node
+        """
+
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.pop = pop
+
+
+# The two level 0 nodes, representing a single dead or live cell
+OFF = Node(None, None, None, None, 0, 0)
+ON = Node(None, None, None, None, 0, 1)
+
+
+@register("hashlife")
+class HashLife(Engine):
+    # The universe goes on past the edges of the map it is exported to
+    unbounded = True
+
+    def __init__(self, w: int, h: int, memory_limit: int = 256, **options):
+        """
+        Initialize an empty HashLife universe.
+        The universe itself is unbounded, w and h only give the size of the maps it is exported to.
+
+        :param w: The width of the exported map in cells
+        :param h: The height of the exported map in cells
+        :param memory_limit: The memory in megabytes the node table and memo may use, before being evicted
+        """
+
+        super().__init__(w, h, **options)
+
+        self.max_nodes = max(1, memory_limit * 1024 * 1024 // NODE_BYTES)
+
+        # The table of canonical nodes, keyed by their quadrants, and the memo of advanced nodes
+        self.table = {}
+        self.results = {}
+        self.empties = [OFF]
+
+        # The root node, and the board coordinates of its top-left cell
+        self.root = self.empty(3)
+        self.x = 0
+        self.y = 0
+
+        self.generation = 0
+
+        # The offsets of the live cells of the small nodes, and the live cells of the map as of the last step
+        self.leaves: Dict[Node, Tuple[np.ndarray, np.ndarray]] = {}
+        self.cells = None
+
+    def join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """
+        Get the canonical node with the given quadrants, creating it if it does not exist.
+
+        :param nw: The north-west quadrant
+        :param ne: The north-east quadrant
+        :param sw: The south-west quadrant
+        :param se: The south-east quadrant
+        :return: The canonical node
+        """
+
+        key = (nw, ne, sw, se)
+        node = self.table.get(key)
+
+        if node is None:
+            node = Node(nw, ne, sw, se, nw.level + 1, nw.pop + ne.pop + sw.pop + se.pop)
+            self.table[key] = node
+
+        return node
+
+    def empty(self, level: int) -> Node:
+        """
+        Get the canonical empty node of a level.
+
+        :param level: The level of the node
+        :return: The empty node
+        """
+
+        while len(self.empties) <= level:
+            e = self.empties[-1]
+            self.empties.append(self.join(e, e, e, e))
+
+        return self.empties[level]
+
+    def centre(self, node: Node) -> Node:
+        """
+        Embed a node in the middle of an empty node one level higher.
+
+        :param node: The node to embed
+        :return: The node one level higher
+        """
+
+        e = self.empty(node.level - 1)
+
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e)
+        )
+
+    def inner(self, node: Node) -> Node:
+        """
+        Get the node one level lower, covering the middle of a node.
+
+        :param node: The node to take the middle of
+        :return: The middle node
+        """
+
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def life_4x4(self, node: Node) -> Node:
+        """
+        Advance a level 2 node by one generation directly, using the rule of the board.
+
+        :param node: A level 2 node, covering 4x4 cells
+        :return: The level 1 node in its middle, one generation later
+        """
+
+        cells = [
+            [node.nw.nw.pop, node.nw.ne.pop, node.ne.nw.pop, node.ne.ne.pop],
+            [node.nw.sw.pop, node.nw.se.pop, node.ne.sw.pop, node.ne.se.pop],
+            [node.sw.nw.pop, node.sw.ne.pop, node.se.nw.pop, node.se.ne.pop],
+            [node.sw.sw.pop, node.sw.se.pop, node.se.sw.pop, node.se.se.pop]
+        ]
+
+        new = []
+        for i in (1, 2):
+            for j in (1, 2):
+                count = sum(cells[i + di][j + dj] for di in (-1, 0, 1) for dj in (-1, 0, 1)) - cells[i][j]
+                new.append(ON if count in (self.survival if cells[i][j] else self.birth) else OFF)
+
+        return self.join(*new)
+
+    def successor(self, node: Node, j: int) -> Node:
+        """
+        Advance a node by 2^j generations.
+        The result is the node one level lower covering the middle of the node,
+        which is the part that cannot be influenced by anything outside the node in that time.
+
+        :param node: The node to advance, of level 2 or higher
+        :param j: The power of two of the generations to advance, at most node.level - 2
+        :return: The middle node, 2^j generations later
+        """
+
+        if node.pop == 0:
+            return node.nw
+
+        # A node can advance at most 2^(level - 2) generations, larger steps are made by its parent
+        j = min(j, node.level - 2)
+
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+
+        if node.level == 2:
+            result = self.life_4x4(node)
+
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+
+            # Advance the nine overlapping sub-nodes one level down
+            c1 = self.successor(self.join(nw.nw, nw.ne, nw.sw, nw.se), j)
+            c2 = self.successor(self.join(nw.ne, ne.nw, nw.se, ne.sw), j)
+            c3 = self.successor(self.join(ne.nw, ne.ne, ne.sw, ne.se), j)
+            c4 = self.successor(self.join(nw.sw, nw.se, sw.nw, sw.ne), j)
+            c5 = self.successor(self.join(nw.se, ne.sw, sw.ne, se.nw), j)
+            c6 = self.successor(self.join(ne.sw, ne.se, se.nw, se.ne), j)
+            c7 = self.successor(self.join(sw.nw, sw.ne, sw.sw, sw.se), j)
+            c8 = self.successor(self.join(sw.ne, se.nw, sw.se, se.sw), j)
+            c9 = self.successor(self.join(se.nw, se.ne, se.sw, se.se), j)
+
+            if j < node.level - 2:
+                # The sub-nodes have advanced far enough, so only their middles are combined
+                result = self.join(
+                    self.join(c1.se, c2.sw, c4.ne, c5.nw),
+                    self.join(c2.se, c3.sw, c5.ne, c6.nw),
+                    self.join(c4.se, c5.sw, c7.ne, c8.nw),
+                    self.join(c5.se, c6.sw, c8.ne, c9.nw)
+                )
+            else:
+                # The sub-nodes have advanced half way, so the four combined quadrants are advanced again
+                result = self.join(
+                    self.successor(self.join(c1, c2, c4, c5), j),
+                    self.successor(self.join(c2, c3, c5, c6), j),
+                    self.successor(self.join(c4, c5, c7, c8), j),
+                    self.successor(self.join(c5, c6, c8, c9), j)
+                )
+
+        self.results[key] = result
+        return result
+
+    def advance(self, n: int):
+        """
+        Advance the universe by n generations, jumping 2^j generations for every set bit j of n.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        # The live cells kept for the next step no longer match the board
+        self.cells = None
+
+        j = 0
+        while n:
+            if n & 1:
+                # Pad the root until the pattern can not reach outside its middle in 2^j generations
+                while self.root.level < j + 3 or self.inner(self.inner(self.root)).pop != self.root.pop:
+                    self.x -= 1 << (self.root.level - 1)
+                    self.y -= 1 << (self.root.level - 1)
+                    self.root = self.centre(self.root)
+
+                self.x += 1 << (self.root.level - 2)
+                self.y += 1 << (self.root.level - 2)
+                self.root = self.successor(self.root, j)
+
+                self.generation += 1 << j
+                self.evict()
+
+            n >>= 1
+            j += 1
+
+    def step(self, n: int = 1):
+        """
+        Advance the universe n generations, comparing the live cells of the map before and after to find the changes,
+        as the quadtree does not keep the previous generation around.
+        The live cells are found by walking only the nodes that hold any, so a step costs as much as the population,
+        rather than as much as the map.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        before = self.cells if self.cells is not None else self.live()
+        self.advance(n)
+        self.cells = self.live()
+
+        # Both are sorted and free of repeats, so the cells in only one of them are the ones that changed
+        self.diff = np.divmod(np.setxor1d(before, self.cells, assume_unique=True), self.w)
+
+    def live(self) -> np.ndarray:
+        """
+        Find the live cells inside the map, skipping empty nodes and nodes outside the map.
+
+        :return: The live cells as sorted indexes into the flattened map
+        """
+
+        rows = []
+        cols = []
+
+        stack = [(self.root, self.x, self.y)]
+        while stack:
+            node, x, y = stack.pop()
+
+            size = 1 << node.level
+            if node.pop == 0 or x >= self.w or y >= self.h or x + size <= 0 or y + size <= 0:
+                continue
+
+            if node.level <= LEAF_LEVEL:
+                leaf_rows, leaf_cols = self.leaf(node)
+                rows.append(leaf_rows + y)
+                cols.append(leaf_cols + x)
+                continue
+
+            half = size >> 1
+            stack.append((node.nw, x, y))
+            stack.append((node.ne, x + half, y))
+            stack.append((node.sw, x, y + half))
+            stack.append((node.se, x + half, y + half))
+
+        if not rows:
+            return np.zeros(0, dtype="int64")
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+
+        # The small nodes on the edges of the map may reach past it
+        inside = (rows >= 0) & (rows < self.h) & (cols >= 0) & (cols < self.w)
+
+        return np.sort(rows[inside] * self.w + cols[inside])
+
+    def leaf(self, node: Node) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the offsets of the live cells of a small node from its top-left cell, which are memoized per node.
+
+        :param node: A node of at most LEAF_LEVEL
+        :return: The row and column offsets, as two np.ndarrays
+        """
+
+        offsets = self.leaves.get(node)
+
+        if offsets is None:
+            size = 1 << node.level
+            cells = np.zeros((size, size), dtype="uint8")
+            self.paint(node, 0, 0, cells)
+
+            rows, cols = np.nonzero(cells)
+            offsets = (rows.astype("int64"), cols.astype("int64"))
+            self.leaves[node] = offsets
+
+        return offsets
+
+    def evict(self):
+        """
+        Free the node table and memo if they exceed the memory limit.
+        The nodes of the current root are put back into the table, so it stays canonical.
+
+        :return: None
+        """
+
+        if len(self.table) + len(self.results) <= self.max_nodes:
+            return
+
+        self.table.clear()
+        self.results.clear()
+        self.leaves.clear()
+        self.empties = [OFF]
+        self.root = self.rebuild(self.root)
+
+    def rebuild(self, node: Node) -> Node:
+        """
+        Intern a node and all nodes below it into the table.
+
+        :param node: The node to intern
+        :return: The canonical node
+        """
+
+        if node.level == 0:
+            return node
+
+        if node.pop == 0:
+            return self.empty(node.level)
+
+        return self.join(self.rebuild(node.nw), self.rebuild(node.ne), self.rebuild(node.sw), self.rebuild(node.se))
+
+    def load(self, board: np.ndarray):
+        """
+        Load the universe from a map of the kind used by the game class.
+        The map is placed with its top-left cell at the origin, and everything outside it is dead.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        level = 3
+        while 1 << level < max(board.shape):
+            level += 1
+
+        padded = np.zeros((1 << level, 1 << level), dtype="bool")
+        padded[:board.shape[0], :board.shape[1]] = board
+
+        self.root = self.build(padded, level)
+        self.x = 0
+        self.y = 0
+        self.generation = 0
+
+        self.cells = None
+
+    def build(self, cells: np.ndarray, level: int) -> Node:
+        """
+        Build the node covering a square array of cells.
+
+        :param cells: A square np.ndarray of 2^level cells
+        :param level: The level of the node
+        :return: The canonical node
+        """
+
+        if level == 0:
+            return ON if cells[0, 0] else OFF
+
+        if not cells.any():
+            return self.empty(level)
+
+        half = 1 << (level - 1)
+        return self.join(
+            self.build(cells[:half, :half], level - 1),
+            self.build(cells[:half, half:], level - 1),
+            self.build(cells[half:, :half], level - 1),
+            self.build(cells[half:, half:], level - 1)
+        )
+
+    def export(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Export the universe to a map of the kind used by the game class.
+        Only the cells inside the map are exported, live cells outside of it are cut off.
+
+        :param out: An optional np.ndarray of shape (h, w) to write the cells into
+        :return: The map
+        """
+
+        if out is None:
+            out = np.zeros((self.h, self.w), dtype="uint8")
+
+        out.fill(0)
+        self.paint(self.root, self.x, self.y, out)
+        return out
+
+    def paint(self, node: Node, x: int, y: int, out: np.ndarray):
+        """
+        Write the live cells of a node into a map, skipping empty nodes and nodes outside the map.
+
+        :param node: The node to write
+        :param x: The column of the top-left cell of the node
+        :param y: The row of the top-left cell of the node
+        :param out: The np.ndarray to write into
+        :return: None
+        """
+
+        size = 1 << node.level
+        if node.pop == 0 or x >= out.shape[1] or y >= out.shape[0] or x + size <= 0 or y + size <= 0:
+            return
+
+        if node.level == 0:
+            out[y, x] = 1
+            return
+
+        half = size >> 1
+        self.paint(node.nw, x, y, out)
+        self.paint(node.ne, x + half, y, out)
+        self.paint(node.sw, x, y + half, out)
+        self.paint(node.se, x + half, y + half, out)
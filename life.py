@@ -0,0 +1,224 @@
+"""
+The command line runner, which steps a pattern through the same simulation as the game, without opening a window.
+Neither pygame nor screeninfo is imported, so it runs on machines without a display, such as:
+
+    python -m life run pattern.rle --generations 100000 --engine bitboard --output final.rle
+    python -m life ensemble --members 10000 --width 64 --height 64 --generations 5000
+"""
+
+import sys
+import json
+import time
+import argparse
+from typing import List
+
+import engines
+import patterns
+import rules
+from config import config
+from simulation import Simulation
+from stats import StatsLog
+from metrics import Metrics, MetricsServer
+from ensemble import Ensemble
+
+
+def parser() -> argparse.ArgumentParser:
+    """
+    Build the parser of the command line arguments, defaulting to the settings in the config.
+
+    :return: The parser
+    """
+
+    parser = argparse.ArgumentParser(prog="life", description="Run the game of life without a window.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="step a pattern and write the final state and stats")
+    run.add_argument("pattern", help="the starting pattern, as a .rle or .cells file")
+    run.add_argument("-g", "--generations", type=int, default=1000, help="the amount of generations to step")
+    run.add_argument("-e", "--engine", default=config.engine, choices=list(engines.ENGINES), help="the engine")
+    run.add_argument("-r", "--rule", default=None, help="the rule in B/S notation, by default the pattern's own")
+    run.add_argument("-t", "--topology", default=config.topology, choices=rules.TOPOLOGIES, help="the topology")
+    run.add_argument("--width", type=int, default=None, help="the width of the board, by default fitting the pattern")
+    run.add_argument("--height", type=int, default=None, help="the height of the board, by default fitting the pattern")
+    run.add_argument("--workers", type=int, default=config.workers, help="the workers of the parallel engines")
+    run.add_argument("--trajectories", default="", help="a directory to remember the computed generations in")
+    run.add_argument("-o", "--output", default="", help="the file to write the final state to, as .rle or .cells")
+    run.add_argument("-l", "--log", default="", help="a .jsonl or .csv file to append every generation's stats to")
+    run.add_argument("--metrics-port", type=int, default=0, help="a localhost port to serve Prometheus metrics on")
+    run.add_argument("-s", "--stats", default="", help="the file to write the stats to as JSON, by default stdout")
+
+    ensemble = commands.add_parser("ensemble", help="step many random soups at once and report how each ended")
+    ensemble.add_argument("-n", "--members", type=int, default=1000, help="the amount of soups")
+    ensemble.add_argument("-g", "--generations", type=int, default=1000, help="the most generations to step")
+    ensemble.add_argument("-r", "--rule", default=config.rule, help="the rule in B/S notation")
+    ensemble.add_argument("-t", "--topology", default=config.topology, choices=rules.TOPOLOGIES, help="the topology")
+    ensemble.add_argument("--width", type=int, default=64, help="the width of every board")
+    ensemble.add_argument("--height", type=int, default=64, help="the height of every board")
+    ensemble.add_argument("--density", type=float, default=0.5, help="the fraction of live cells in the soups")
+    ensemble.add_argument("--seed", type=int, default=None, help="the seed of the soups")
+    ensemble.add_argument("--history", type=int, default=16, help="the longest period noticed")
+    ensemble.add_argument("-s", "--stats", default="", help="the file to write the stats to as JSON, by default stdout")
+
+    return parser
+
+
+def run(args: argparse.Namespace) -> dict:
+    """
+    Load a pattern into a board, step it and write the final state.
+
+    :param args: The parsed arguments of the run command
+    :return: The stats of the run
+    """
+
+    pattern, pattern_rule = patterns.read(args.pattern)
+    rule = args.rule or pattern_rule or config.rule
+
+    # The board fits the pattern, and is at least the size of the board in the config
+    w = args.width or max(config.w, pattern.shape[1])
+    h = args.height or max(config.h, pattern.shape[0])
+
+    # A single run has nothing to replay from memory, so the generations are only remembered on disk, if asked to
+    simulation = Simulation(
+        w,
+        h,
+        engine=args.engine,
+        rule=rule,
+        topology=args.topology,
+        workers=args.workers,
+        hashlife_memory=config.hashlife_memory,
+        cycle_history=config.cycle_history,
+        trajectory_memory=config.trajectory_memory if args.trajectories else 0,
+        trajectory_directory=args.trajectories,
+        trajectory_disk=config.trajectory_disk
+    )
+
+    simulation.map[:] = patterns.place(pattern, w, h)
+    population = int(simulation.map.sum())
+
+    log = StatsLog(args.log) if args.log else None
+    metrics = Metrics() if args.metrics_port else None
+    server = MetricsServer(metrics, args.metrics_port) if metrics is not None else None
+
+    try:
+        start = time.perf_counter()
+
+        # Without a log or metrics, nothing but the tick is left in the loop
+        if log is None and metrics is None:
+            for _ in range(args.generations):
+                simulation.tick()
+        else:
+            for _ in range(args.generations):
+                tick_start = time.perf_counter()
+                simulation.tick()
+                tick_seconds = time.perf_counter() - tick_start
+
+                if log is not None:
+                    log.write(
+                        simulation.generation,
+                        simulation.population,
+                        simulation.births,
+                        simulation.deaths,
+                        tick_seconds
+                    )
+
+                if metrics is not None:
+                    metrics.tick(tick_seconds, simulation.generation, simulation.population)
+
+        seconds = time.perf_counter() - start
+    finally:
+        simulation.close()
+
+        if log is not None:
+            log.close()
+
+        if server is not None:
+            server.close()
+
+    if args.output:
+        patterns.write(args.output, simulation.map, rule)
+
+    return {
+        "pattern": args.pattern,
+        "engine": args.engine,
+        "rule": rule,
+        "topology": args.topology,
+        "width": w,
+        "height": h,
+        "generations": args.generations,
+        "seconds": seconds,
+        "generations_per_second": args.generations / seconds if seconds else None,
+        "initial_population": population,
+        "final_population": int(simulation.map.sum()),
+        "cycle_start": simulation.cycles.start,
+        "period": simulation.cycles.period
+    }
+
+
+def run_ensemble(args: argparse.Namespace) -> dict:
+    """
+    Step an ensemble of random soups, until every member has finished or the generations run out.
+
+    :param args: The parsed arguments of the ensemble command
+    :return: The stats of the run, and how every member ended
+    """
+
+    ensemble = Ensemble.soups(
+        args.members,
+        args.width,
+        args.height,
+        args.density,
+        args.seed,
+        rule=args.rule,
+        topology=args.topology,
+        history=args.history
+    )
+
+    start = time.perf_counter()
+    active = ensemble.advance(args.generations)
+    seconds = time.perf_counter() - start
+
+    members = ensemble.results()
+
+    return {
+        "rule": args.rule,
+        "topology": args.topology,
+        "width": args.width,
+        "height": args.height,
+        "members": args.members,
+        "generations": ensemble.generation,
+        "seconds": seconds,
+        "active": active,
+        "dead": sum(member["state"] == "dead" for member in members.values()),
+        "stable": sum(member["state"] == "stable" for member in members.values()),
+        "results": members
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Run the command given on the command line.
+
+    :param argv: The arguments, by default those of the process
+    :return: The exit code
+    """
+
+    args = parser().parse_args(argv)
+
+    try:
+        stats = run(args) if args.command == "run" else run_ensemble(args)
+    except (OSError, ValueError) as e:
+        print(f"life: {e}", file=sys.stderr)
+        return 1
+
+    if args.stats:
+        with open(args.stats, "w") as f:
+            json.dump(stats, f, indent=4)
+    else:
+        json.dump(stats, sys.stdout, indent=4)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
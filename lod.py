@@ -0,0 +1,116 @@
+"""
+This file contains the pyramid used to draw the board zoomed out past a pixel per cell.
+Every level counts the live cells in blocks twice the size of the level below, so a zoomed out view is read
+straight from one level, and the levels are kept up by recounting only the blocks holding changed cells.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import numpy as np
+from typing import List
+
+# How the blocks of cells are shaded: by the fraction of live cells, or fully if any cell is alive
+SHADINGS = ("density", "any")
+
+
+def reduce(cells: np.ndarray) -> np.ndarray:
+    """
+    Count the live cells in every 2x2 block, the blocks past an odd edge counting the cells they hold.
+
+    :param cells: A np.ndarray of shape (h, w), of cells or counts of the level below
+    :return: The counts, as a np.ndarray of shape (ceil(h / 2), ceil(w / 2))
+    """
+
+    h, w = cells.shape
+
+    padded = np.zeros((h + h % 2, w + w % 2), dtype="uint32")
+    padded[:h, :w] = cells
+
+    return padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).sum(axis=(1, 3), dtype="uint32")
+
+
+class Pyramid:
+    def __init__(self, depth: int):
+        """
+        Initialize an empty pyramid.
+
+        :param depth: The amount of levels, the last counting blocks of 2 ** depth by 2 ** depth cells
+        """
+
+        self.depth = depth
+
+        # The counts of every level, the first of 2x2 blocks, empty until built
+        self.levels: List[np.ndarray] = []
+
+    def build(self, board: np.ndarray):
+        """
+        Count every block of every level from the board.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        self.levels = []
+
+        cells = board != 0
+        for _ in range(self.depth):
+            cells = reduce(cells)
+            self.levels.append(cells)
+
+    def update(self, board: np.ndarray, rows: np.ndarray, cols: np.ndarray):
+        """
+        Recount the blocks holding the changed cells, level by level, from the counts of the level below.
+
+        :param board: The board the pyramid was built from, with the changes made, holding ones and zeros
+        :param rows: The row indexes of the changed cells
+        :param cols: The column indexes of the changed cells
+        :return: None
+        """
+
+        below = board
+        for level in self.levels:
+            # Every block is recounted once, however many of its cells changed
+            blocks = np.unique((rows >> 1) * level.shape[1] + (cols >> 1))
+            rows, cols = np.divmod(blocks, level.shape[1])
+
+            h, w = below.shape
+            top, left = rows * 2, cols * 2
+
+            # The blocks past an odd edge of the level below only have the cells inside of it
+            lower = np.minimum(top + 1, h - 1)
+            right = np.minimum(left + 1, w - 1)
+            has_lower = top + 1 < h
+            has_right = left + 1 < w
+
+            level[rows, cols] = (
+                below[top, left].astype("uint32") +
+                below[top, right] * has_right +
+                below[lower, left] * has_lower +
+                below[lower, right] * (has_lower & has_right)
+            )
+
+            below = level
+
+    def shades(self, depth: int, rows: slice, cols: slice, shading: str = "density") -> np.ndarray:
+        """
+        Shade a window of the blocks of a level, from 0 for empty to 255 for full.
+
+        :param depth: The level, 1 being the 2x2 blocks
+        :param rows: The slice of rows of cells in the window
+        :param cols: The slice of columns of cells in the window
+        :param shading: How the blocks are shaded, one of SHADINGS
+        :return: The shades, as a np.ndarray of uint8 with a block per pixel
+        """
+
+        level = self.levels[depth - 1]
+
+        # The window is widened to whole blocks
+        size = 1 << depth
+        counts = level[
+            rows.start // size:-(-rows.stop // size),
+            cols.start // size:-(-cols.stop // size)
+        ]
+
+        if shading == "any":
+            return np.where(counts != 0, 255, 0).astype("uint8")
+
+        return (counts * 255 // (size * size)).astype("uint8")
@@ -126,9 +126,13 @@ class Menu:
         :return: None
         """
 
-        # Initialize, run and delete the game object
+        # Initialize, run and delete the game object.
+        # The game is closed however it ends, so the worker processes of its simulation are always stopped.
         game = Game(self.window)
-        game.run()
+        try:
+            game.run()
+        finally:
+            game.close()
         del game
 
         # Render the scene once again, to overwrite the games rendering
@@ -0,0 +1,254 @@
+"""
+This file contains the metrics of a running simulation, and a small HTTP server exposing them to Prometheus.
+The simulation loop only bumps plain counters, and the server thread formats them when scraped,
+so scraping never takes a lock the loop has to wait for.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import os
+import sys
+import time
+import bisect
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Optional
+
+# The upper bounds of the latency histogram buckets in seconds, the last bucket being unbounded
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = BUCKETS):
+        """
+        A latency histogram of the kind Prometheus expects, counting the observations per bucket.
+
+        :param buckets: The upper bounds of the buckets in seconds, in increasing order
+        """
+
+        self.buckets = buckets
+
+        # The observations falling in each bucket, not cumulative, the last being past the largest bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float, n: int = 1):
+        """
+        Count an observation.
+
+        :param seconds: The latency
+        :param n: The amount of times it was observed
+        :return: None
+        """
+
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += n
+        self.sum += seconds * n
+        self.count += n
+
+    def format(self, name: str, help_text: str) -> List[str]:
+        """
+        Format the histogram in the Prometheus text format.
+
+        :param name: The name of the metric
+        :param help_text: The description of the metric
+        :return: The lines of the metric
+        """
+
+        counts = list(self.counts)
+
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), counts):
+            total += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total}')
+
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {total}")
+
+        return lines
+
+
+def memory() -> Optional[int]:
+    """
+    Get the resident memory of the process.
+
+    :return: The memory in bytes, or None if it can not be found on this platform
+    """
+
+    # On Linux the current resident size is read from proc, elsewhere the peak size is the best available
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # The peak size is in kilobytes on Linux, and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Metrics:
+    def __init__(self, window: int = 128):
+        """
+        Initialize the metrics of a simulation.
+
+        :param window: The amount of recent generations the generations per second are measured over
+        """
+
+        self.generation = 0
+        self.generations_total = 0
+        self.population = 0
+
+        self.tick_latency = Histogram()
+        self.render_latency = Histogram()
+
+        # The times the recent generations were recorded at, and how many were recorded at once,
+        # which a deque appends to and drops from without locking
+        self.times = deque(maxlen=window)
+
+    def tick(self, seconds: float, generation: int, population: int, generations: int = 1):
+        """
+        Record a generation, or several calculated since the last one recorded.
+
+        :param seconds: The time a generation took to calculate
+        :param generation: The generation, counted since the board was last edited
+        :param population: The live cells
+        :param generations: The amount of generations calculated since the last one recorded
+        :return: None
+        """
+
+        self.tick_latency.observe(seconds, generations)
+        self.generation = generation
+        self.population = population
+        self.generations_total += generations
+        self.times.append((time.perf_counter(), generations))
+
+    def render(self, seconds: float):
+        """
+        Record the rendering of a generation.
+
+        :param seconds: The time the generation took to render
+        :return: None
+        """
+
+        self.render_latency.observe(seconds)
+
+    def rate(self) -> float:
+        """
+        The generations per second over the recent generations, falling to 0 once they stop.
+
+        :return: The rate
+        """
+
+        recorded = list(self.times)
+        if len(recorded) < 2:
+            return 0.0
+
+        elapsed = recorded[-1][0] - recorded[0][0]
+        interval = elapsed / (len(recorded) - 1)
+
+        # The generations recorded first were calculated before the window starts
+        generations = sum(n for _, n in recorded[1:])
+
+        # Waiting longer than usual for the next generation counts too, so a stopped simulation falls to 0
+        idle = max(0.0, time.perf_counter() - recorded[-1][0] - interval)
+
+        return generations / (elapsed + idle) if elapsed + idle > 0 else 0.0
+
+    def format(self) -> str:
+        """
+        Format every metric in the Prometheus text format.
+
+        :return: The text served to scrapers
+        """
+
+        lines = [
+            "# HELP life_generation The generation of the board, counted since it was last edited.",
+            "# TYPE life_generation gauge",
+            f"life_generation {self.generation}",
+            "# HELP life_generations_total The generations calculated since the process started.",
+            "# TYPE life_generations_total counter",
+            f"life_generations_total {self.generations_total}",
+            "# HELP life_generations_per_second The generations calculated per second, recently.",
+            "# TYPE life_generations_per_second gauge",
+            f"life_generations_per_second {self.rate()}",
+            "# HELP life_population The live cells on the board.",
+            "# TYPE life_population gauge",
+            f"life_population {self.population}"
+        ]
+
+        lines += self.tick_latency.format("life_tick_seconds", "The time a generation takes to calculate.")
+        lines += self.render_latency.format("life_render_seconds", "The time a generation takes to render.")
+
+        resident = memory()
+        if resident is not None:
+            lines += [
+                "# HELP process_resident_memory_bytes The resident memory of the process.",
+                "# TYPE process_resident_memory_bytes gauge",
+                f"process_resident_memory_bytes {resident}"
+            ]
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    def __init__(self, metrics: Metrics, port: int, host: str = "127.0.0.1"):
+        """
+        Serve metrics at /metrics from a daemon thread, bound to localhost by default.
+
+        :param metrics: The metrics to serve
+        :param port: The port to listen on
+        :param host: The address to listen on
+        """
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+
+                body = metrics.format().encode()
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            # Scrapes are not logged, as they would flood the output
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self) -> int:
+        """
+        The port the server listens on, which is picked by the system if 0 was given.
+
+        :return: The port
+        """
+
+        return self.server.server_address[1]
+
+    def close(self):
+        """
+        Stop the server and wait for its thread to finish.
+
+        :return: None
+        """
+
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
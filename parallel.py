@@ -0,0 +1,317 @@
+"""
+This file contains boards that are stepped in parallel, by a pool of worker processes or of threads.
+Every worker steps its own band of rows of the padded double buffers,
+reading the rows bordering its band straight from the shared buffer, with a barrier between generations.
+"""
+
+import os
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from typing import Tuple
+
+import rules
+from engines import Engine, register
+
+# The least amount of rows a thread steps, below which the threads cost more than they gain
+MIN_BAND_ROWS = 64
+
+
+def work(names: Tuple[str, str, str], h: int, w: int, start: int, stop: int, table: np.ndarray, topology: str,
+         command, go, done, sync):
+    """
+    The main function of a worker process, stepping rows start to stop of the board until told to stop.
+
+    :param names: The names of the shared memory blocks of the two buffers and the changed mask
+    :param h: The height of the board
+    :param w: The width of the board
+    :param start: The first row of the band
+    :param stop: The end row of the band
+    :param table: The lookup table of the rule, as given by rules.lookup_table
+    :param topology: What lies past the edges of the board, one of rules.TOPOLOGIES
+    :param command: A shared array of the front buffer index and the amount of generations to step, 0 meaning stop
+    :param go: The barrier releasing the workers for a step
+    :param done: The barrier signalling the step is done
+    :param sync: The barrier between the generations of a step, shared by the workers only
+    :return: None
+    """
+
+    blocks = [SharedMemory(name=name) for name in names]
+    buffers = [np.ndarray((h + 2, w + 2), dtype="uint8", buffer=block.buf) for block in blocks[:2]]
+    changed = np.ndarray((h, w), dtype="uint8", buffer=blocks[2].buf)
+
+    # The views of the band in both buffers, and private scratch buffers for the counts and table rows
+    views = [[view[start:stop] for view in rules.neighbor_views(buffer)] for buffer in buffers]
+    maps = [buffer[1 + start:1 + stop, 1:-1] for buffer in buffers]
+    counts = np.zeros((stop - start, w), dtype="uint8")
+    masks = np.zeros((stop - start, w), dtype="uint16")
+
+    while True:
+        go.wait()
+
+        front, n = command[0], command[1]
+        if n == 0:
+            break
+
+        for generation in range(n):
+            # Wait for the other bands to finish the previous generation, before reading their rows
+            if generation:
+                sync.wait()
+
+            rules.step(views[front], maps[front], maps[1 - front], counts, masks, table)
+            front = 1 - front
+
+            # Every band refreshes the padding its own rows feed, which the others read after the barrier
+            rules.wrap(buffers[front], topology, start, stop)
+
+        changed[start:stop] = counts
+        done.wait()
+
+    # Drop the arrays before closing the memory they point into
+    del buffers, changed, views, maps
+
+    for block in blocks:
+        block.close()
+
+
+@register("processes")
+class ProcessBoard(Engine):
+    def __init__(self, w: int, h: int, workers: int = 0, **options):
+        """
+        Initialize an empty board, and start the worker processes that step it.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        :param workers: The amount of worker processes, each stepping a band of rows, 0 using one per CPU
+        """
+
+        super().__init__(w, h, **options)
+
+        if workers < 1:
+            workers = os.cpu_count() or 1
+        workers = min(workers, h)
+
+        # Allocate the two padded buffers and the changed mask in shared memory
+        self.blocks = [SharedMemory(create=True, size=(h + 2) * (w + 2)) for _ in range(2)]
+        self.blocks.append(SharedMemory(create=True, size=h * w))
+
+        self.buffers = [np.ndarray((h + 2, w + 2), dtype="uint8", buffer=block.buf) for block in self.blocks[:2]]
+        self.maps = [buffer[1:-1, 1:-1] for buffer in self.buffers]
+        self.changed_mask = np.ndarray((h, w), dtype="uint8", buffer=self.blocks[2].buf)
+
+        for buffer in self.buffers:
+            buffer.fill(0)
+
+        self.front = 0
+
+        # Spawn starts the workers fresh, rather than forking the window and the rest of the pygame state
+        context = multiprocessing.get_context("spawn")
+
+        # The barriers are kept on the board, so they outlive the start-up of the workers
+        self.command = context.RawArray("l", 2)
+        self.go = context.Barrier(workers + 1)
+        self.done = context.Barrier(workers + 1)
+        self.sync = context.Barrier(workers)
+
+        bands = np.linspace(0, h, workers + 1).astype("int").tolist()
+        names = tuple(block.name for block in self.blocks)
+
+        self.processes = [
+            context.Process(
+                target=work,
+                args=(
+                    names, h, w, bands[i], bands[i + 1], self.lookup, self.topology,
+                    self.command, self.go, self.done, self.sync
+                ),
+                daemon=True
+            )
+            for i in range(workers)
+        ]
+
+        for process in self.processes:
+            process.start()
+
+    def load(self, board: np.ndarray):
+        """
+        Load the board from a map of the kind used by the game class.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        self.maps[self.front][:] = board
+        rules.wrap(self.buffers[self.front], self.topology)
+
+    def export(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Export the board to a map of the kind used by the game class.
+
+        :param out: An optional np.ndarray of shape (h, w) to write the cells into
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        if out is None:
+            return self.maps[self.front].copy()
+
+        out[:] = self.maps[self.front]
+        return out
+
+    def advance(self, n: int):
+        """
+        Advance the board n generations, with all workers stepping their band in parallel.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        if n < 1:
+            return
+
+        self.command[0] = self.front
+        self.command[1] = n
+
+        self.go.wait()
+        self.done.wait()
+
+        self.front = (self.front + n) % 2
+
+    def last_changed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the cells that changed in the last generation.
+
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        return np.nonzero(self.changed_mask)
+
+    def close(self):
+        """
+        Stop the worker processes and free the shared memory.
+
+        :return: None
+        """
+
+        if not self.processes:
+            return
+
+        self.command[1] = 0
+        self.go.wait()
+
+        for process in self.processes:
+            process.join()
+        self.processes = []
+
+        # Drop the arrays before closing the memory they point into
+        self.buffers = self.maps = self.changed_mask = None
+
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+@register("threads")
+class ThreadBoard(Engine):
+    def __init__(self, w: int, h: int, workers: int = 0, **options):
+        """
+        Initialize an empty board, stepped in bands by a pool of threads.
+        NumPy releases the GIL while running the array kernels, so the bands are stepped in parallel,
+        and on free-threaded builds of CPython the rest of the step runs in parallel too.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        :param workers: The amount of threads, 0 sizes the pool from the board size and the CPU count
+        """
+
+        super().__init__(w, h, **options)
+
+        if workers < 1:
+            workers = os.cpu_count() or 1
+        bands = max(1, min(workers, h // MIN_BAND_ROWS))
+
+        self.buffers = [np.zeros((h + 2, w + 2), dtype="uint8") for _ in range(2)]
+        self.maps = [buffer[1:-1, 1:-1] for buffer in self.buffers]
+
+        # The scratch buffers shared by the bands, the counts afterwards holding the changed mask
+        self.counts = np.zeros((h, w), dtype="uint8")
+        self.masks = np.zeros((h, w), dtype="uint16")
+
+        self.front = 0
+
+        # The arguments of the kernel for every band, from either buffer to the other, made once up front
+        rows = np.linspace(0, h, bands + 1).astype("int").tolist()
+        self.bands = [
+            [
+                (
+                    [view[start:stop] for view in rules.neighbor_views(self.buffers[front])],
+                    self.maps[front][start:stop],
+                    self.maps[1 - front][start:stop],
+                    self.counts[start:stop],
+                    self.masks[start:stop],
+                    self.lookup
+                )
+                for start, stop in zip(rows, rows[1:])
+            ]
+            for front in range(2)
+        ]
+
+        self.executor = ThreadPoolExecutor(max_workers=bands)
+
+    def load(self, board: np.ndarray):
+        """
+        Load the board from a map of the kind used by the game class.
+
+        :param board: A np.ndarray of shape (h, w), where non-zero cells are alive
+        :return: None
+        """
+
+        self.maps[self.front][:] = board
+        rules.wrap(self.buffers[self.front], self.topology)
+
+    def export(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Export the board to a map of the kind used by the game class.
+
+        :param out: An optional np.ndarray of shape (h, w) to write the cells into
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        if out is None:
+            return self.maps[self.front].copy()
+
+        out[:] = self.maps[self.front]
+        return out
+
+    def advance(self, n: int):
+        """
+        Advance the board n generations, with the threads stepping the bands in parallel.
+
+        :param n: The amount of generations to advance
+        :return: None
+        """
+
+        for _ in range(n):
+            # Collecting the results waits for every band, which is the barrier between the generations
+            for _ in self.executor.map(lambda band: rules.step(*band), self.bands[self.front]):
+                pass
+
+            self.front = 1 - self.front
+            rules.wrap(self.buffers[self.front], self.topology)
+
+    def last_changed(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the cells that changed in the last generation.
+
+        :return: The row and column indexes of the changed cells, as two np.ndarrays
+        """
+
+        return np.nonzero(self.counts)
+
+    def close(self):
+        """
+        Stop the threads.
+
+        :return: None
+        """
+
+        self.executor.shutdown()
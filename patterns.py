@@ -0,0 +1,194 @@
+"""
+This file contains the readers and writers of pattern files, in the RLE format and the plaintext .cells format.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import re
+import numpy as np
+from typing import Tuple, Optional
+
+# The header line of an RLE file, giving the size of the pattern and optionally its rule
+RLE_HEADER = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?")
+
+# A run of an RLE file, an optional count followed by a tag
+RLE_RUN = re.compile(r"(\d*)([bo$!])")
+
+
+def read(path: str) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Read a pattern file, picking the format by its extension.
+
+    :param path: The path of a .rle or .cells file
+    :return: The pattern as a np.ndarray, where 1 is alive, and its rule in B/S notation, if the file gives one
+    """
+
+    with open(path, "r") as f:
+        text = f.read()
+
+    if path.endswith(".cells"):
+        return parse_cells(text), None
+
+    return parse_rle(text)
+
+
+def write(path: str, board: np.ndarray, rule: str = None):
+    """
+    Write a pattern file, picking the format by its extension.
+
+    :param path: The path of a .rle or .cells file
+    :param board: The pattern, where non-zero cells are alive
+    :param rule: The rule of the pattern in B/S notation, written to RLE files
+    :return: None
+    """
+
+    with open(path, "w") as f:
+        f.write(format_cells(board) if path.endswith(".cells") else format_rle(board, rule))
+
+
+def parse_rle(text: str) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Parse a pattern in the RLE format, where b is a dead cell, o a live cell, $ the end of a row and ! the end.
+    States other than b and o are not supported.
+
+    :param text: The content of the file
+    :return: The pattern as a np.ndarray, and its rule in B/S notation, if the header gives one
+    """
+
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line and not line.startswith("#")]
+
+    if not lines:
+        raise ValueError("Empty RLE pattern")
+
+    header = RLE_HEADER.match(lines[0])
+    if header is None:
+        raise ValueError(f"Invalid RLE header \"{lines[0]}\"")
+
+    w, h = int(header.group(1)), int(header.group(2))
+    rule = header.group(3)
+
+    # Rules given as S/B, such as 23/3, are turned around to B/S notation
+    if rule is not None and "b" not in rule.lower():
+        survival, _, birth = rule.partition("/")
+        rule = f"B{birth}/S{survival}"
+
+    board = np.zeros((h, w), dtype="uint8")
+    i = j = 0
+
+    for count, tag in RLE_RUN.findall("".join(lines[1:])):
+        count = int(count) if count else 1
+
+        if tag == "!":
+            break
+        elif tag == "$":
+            i += count
+            j = 0
+        else:
+            # A run past the size in the header would fall off the board
+            if i >= h or j + count > w:
+                raise ValueError("RLE pattern exceeds its header size")
+
+            if tag == "o":
+                board[i, j:j + count] = 1
+            j += count
+
+    return board, rule.upper() if rule is not None else None
+
+
+def format_rle(board: np.ndarray, rule: str = None) -> str:
+    """
+    Format a pattern in the RLE format, with lines of at most 70 characters.
+
+    :param board: The pattern, where non-zero cells are alive
+    :param rule: The rule of the pattern in B/S notation, written to the header
+    :return: The content of the file
+    """
+
+    h, w = board.shape
+    runs = []
+
+    for row in board != 0:
+        # The runs of a row start where its cells change, a trailing run of dead cells is left out
+        starts = np.flatnonzero(np.diff(row, prepend=~row[0])).tolist() + [w]
+        for start, stop in zip(starts, starts[1:]):
+            if row[start] or stop < w:
+                runs.append((stop - start, "o" if row[start] else "b"))
+        runs.append((1, "$"))
+
+    # Trailing empty rows are left out, and the last row is ended by ! instead
+    while runs and runs[-1][1] == "$":
+        runs.pop()
+
+    # Consecutive row ends are merged into one run
+    merged = []
+    for count, tag in runs:
+        if merged and tag == "$" and merged[-1][1] == "$":
+            merged[-1] = (merged[-1][0] + count, tag)
+        else:
+            merged.append((count, tag))
+    merged.append((1, "!"))
+
+    lines = [f"x = {w}, y = {h}" + (f", rule = {rule}" if rule else "")]
+    line = ""
+
+    for count, tag in merged:
+        run = (str(count) if count > 1 else "") + tag
+        if len(line) + len(run) > 70:
+            lines.append(line)
+            line = ""
+        line += run
+
+    lines.append(line)
+
+    return "\n".join(lines) + "\n"
+
+
+def parse_cells(text: str) -> np.ndarray:
+    """
+    Parse a pattern in the plaintext format, where . is a dead cell, O a live cell, and lines starting with ! comments.
+
+    :param text: The content of the file
+    :return: The pattern as a np.ndarray
+    """
+
+    rows = [line.rstrip() for line in text.splitlines() if not line.startswith("!")]
+    w = max((len(row) for row in rows), default=0)
+
+    board = np.zeros((len(rows), w), dtype="uint8")
+    for i, row in enumerate(rows):
+        board[i, :len(row)] = [c in "Oo*" for c in row]
+
+    return board
+
+
+def format_cells(board: np.ndarray) -> str:
+    """
+    Format a pattern in the plaintext format.
+
+    :param board: The pattern, where non-zero cells are alive
+    :return: The content of the file
+    """
+
+    return "".join("".join("O" if cell else "." for cell in row) + "\n" for row in board != 0)
+
+
+def place(pattern: np.ndarray, w: int, h: int) -> np.ndarray:
+    """
+    Place a pattern in the middle of an empty board, cutting off anything that does not fit.
+
+    :param pattern: The pattern
+    :param w: The width of the board in cells
+    :param h: The height of the board in cells
+    :return: The board as a np.ndarray of shape (h, w)
+    """
+
+    board = np.zeros((h, w), dtype="uint8")
+
+    ph, pw = pattern.shape
+    top, left = (h - ph) // 2, (w - pw) // 2
+
+    # The parts of the pattern and the board that overlap
+    src = pattern[max(0, -top):max(0, -top) + min(h, ph), max(0, -left):max(0, -left) + min(w, pw)]
+    board[max(0, top):max(0, top) + src.shape[0], max(0, left):max(0, left) + src.shape[1]] = src != 0
+
+    return board
@@ -0,0 +1,205 @@
+"""
+This file contains the profiler, which times the phases of every frame and counts the generations and frames,
+keeping the most recent samples of each to report percentiles and rates from.
+When it is disabled, timing a phase only costs an attribute lookup, so it can be left in the hot paths.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import time
+import numpy as np
+from contextlib import nullcontext
+from typing import Dict
+
+# A context that does nothing, handed out for every phase while the profiler is disabled
+DISABLED = nullcontext()
+
+
+class Samples:
+    def __init__(self, size: int):
+        """
+        A ring buffer of the most recent samples, which overwrites the oldest once it is full.
+
+        :param size: The amount of samples kept
+        """
+
+        self.values = np.zeros(size, dtype="float64")
+        self.count = 0
+
+    def add(self, value: float):
+        """
+        Add a sample, overwriting the oldest if the buffer is full.
+
+        :param value: The sample
+        :return: None
+        """
+
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def recent(self) -> np.ndarray:
+        """
+        Get the samples kept, in no particular order.
+
+        :return: The samples, as a np.ndarray
+        """
+
+        return self.values[:min(self.count, len(self.values))]
+
+    def clear(self):
+        """
+        Forget every sample.
+
+        :return: None
+        """
+
+        self.count = 0
+
+
+class Phase:
+    def __init__(self, samples: Samples):
+        """
+        A reusable context, timing the code run inside it into the samples of a phase.
+
+        :param samples: The samples of the phase, in seconds
+        """
+
+        self.samples = samples
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.samples.add(time.perf_counter() - self.start)
+
+
+class Profiler:
+    def __init__(self, window: int = 256):
+        """
+        Initialize a disabled profiler.
+
+        :param window: The amount of recent samples kept of every phase and counter
+        """
+
+        self.window = window
+        self.enabled = False
+
+        # The durations of the phases, and the times the counted events happened at, both in seconds,
+        # and how many of each event happened at once
+        self.durations: Dict[str, Samples] = {}
+        self.events: Dict[str, Samples] = {}
+        self.amounts: Dict[str, Samples] = {}
+
+        self.phases: Dict[str, Phase] = {}
+
+    def phase(self, name: str):
+        """
+        Time a phase of the frame, such as the tick or the render, by using the returned context around it.
+
+        :param name: The name of the phase
+        :return: A context timing the phase, or doing nothing if the profiler is disabled
+        """
+
+        if not self.enabled:
+            return DISABLED
+
+        if name not in self.phases:
+            self.durations[name] = Samples(self.window)
+            self.phases[name] = Phase(self.durations[name])
+
+        return self.phases[name]
+
+    def record(self, name: str, seconds: float):
+        """
+        Record the duration of a phase timed elsewhere.
+
+        :param name: The name of the phase
+        :param seconds: The duration
+        :return: None
+        """
+
+        if not self.enabled:
+            return
+
+        if name not in self.durations:
+            self.durations[name] = Samples(self.window)
+            self.phases[name] = Phase(self.durations[name])
+
+        self.durations[name].add(seconds)
+
+    def count(self, name: str, n: int = 1):
+        """
+        Count an event, such as a generation or a frame, to report its rate.
+
+        :param name: The name of the event
+        :param n: The amount of times it happened since it was last counted
+        :return: None
+        """
+
+        if not self.enabled:
+            return
+
+        if name not in self.events:
+            self.events[name] = Samples(self.window)
+            self.amounts[name] = Samples(self.window)
+
+        self.events[name].add(time.perf_counter())
+        self.amounts[name].add(n)
+
+    def rate(self, name: str) -> float:
+        """
+        The rate of an event over its recent occurrences.
+
+        :param name: The name of the event
+        :return: The occurrences per second, 0 if it has not occurred twice yet
+        """
+
+        if name not in self.events:
+            return 0.0
+
+        times = self.events[name].recent()
+        if len(times) < 2 or times.max() == times.min():
+            return 0.0
+
+        # The events counted first happened before the window starts
+        amounts = self.amounts[name].recent()
+        return (amounts.sum() - amounts[times.argmin()]) / (times.max() - times.min())
+
+    def percentiles(self, name: str) -> Dict[str, float]:
+        """
+        The percentiles of the recent durations of a phase.
+
+        :param name: The name of the phase
+        :return: The p50, p95 and max in seconds, and the amount of samples they are taken over
+        """
+
+        samples = self.durations[name].recent() if name in self.durations else np.zeros(0)
+
+        if not len(samples):
+            return {"p50": 0.0, "p95": 0.0, "max": 0.0, "samples": 0}
+
+        p50, p95 = np.percentile(samples, (50, 95)).tolist()
+        return {"p50": p50, "p95": p95, "max": float(samples.max()), "samples": len(samples)}
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        Report every phase and rate.
+
+        :return: The percentiles of every phase by name, and the generations and frames per second
+        """
+
+        return {
+            "phases": {name: self.percentiles(name) for name in self.durations},
+            "generations_per_second": self.rate("generation"),
+            "frames_per_second": self.rate("frame")
+        }
+
+    def reset(self):
+        """
+        Forget every sample, keeping the phases and counters.
+
+        :return: None
+        """
+
+        for samples in (*self.durations.values(), *self.events.values(), *self.amounts.values()):
+            samples.clear()
@@ -0,0 +1,147 @@
+"""
+This file contains the rules of the game of life, as array kernels working on padded boards.
+It does not depend on pygame, so the same kernels can be used by the game class and by worker processes.
+"""
+
+import re
+import numpy as np
+from typing import List, Set, Tuple
+
+# The rule of Conway's game of life, which is the default
+CONWAY = "B3/S23"
+
+# The topologies of the board, which decide what lies past its edges:
+# dead cells, the opposite edge, the opposite edge flipped top to bottom, or the edge itself
+TOPOLOGIES = ("dead", "torus", "klein", "mirror")
+
+# A rulestring in B/S notation, the neighbor counts a dead cell is born with, and a live cell survives with
+RULE_PATTERN = re.compile(r"[Bb]([0-8]*)/[Ss]([0-8]*)")
+
+
+def parse(rule: str) -> Tuple[Set[int], Set[int]]:
+    """
+    Parse a rulestring in B/S notation, such as B3/S23 for Conway's game of life or B36/S23 for HighLife.
+
+    :param rule: The rulestring
+    :return: The neighbor counts a dead cell is born with, and the neighbor counts a live cell survives with
+    """
+
+    match = RULE_PATTERN.fullmatch(rule.strip())
+    if match is None:
+        raise ValueError(f"Invalid rule \"{rule}\", please use B/S notation with counts 0 to 8, such as {CONWAY}")
+
+    return {int(c) for c in match.group(1)}, {int(c) for c in match.group(2)}
+
+
+def lookup_table(rule: str) -> np.ndarray:
+    """
+    Compile a rulestring into a lookup table of the next state of a cell, by its state and neighbor count.
+    Each row of the 2x9 table is packed into the bits of a uint16, bit n being the next state with n neighbors,
+    so looking a cell up is a shift by its neighbor count.
+
+    :param rule: The rulestring
+    :return: A np.ndarray of two uint16 masks, for dead and for live cells
+    """
+
+    birth, survival = parse(rule)
+
+    return np.array([sum(1 << n for n in counts) for counts in (birth, survival)], dtype="uint16")
+
+
+def neighbor_views(buffer: np.ndarray) -> List[np.ndarray]:
+    """
+    Get the eight shifted views of a padded buffer, lining the neighbors of every cell up with the cell itself.
+    The board is in the last two axes, so a stack of boards gets the views of every board at once.
+
+    :param buffer: A board with a one cell wide border around it, or a stack of them
+    :return: A list of eight np.ndarrays, each the shape of the board without the border
+    """
+
+    h, w = buffer.shape[-2:]
+
+    return [
+        buffer[..., 1 + di:h - 1 + di, 1 + dj:w - 1 + dj]
+        for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj
+    ]
+
+
+def wrap(buffer: np.ndarray, topology: str, start: int = 0, stop: int = None):
+    """
+    Refresh the padding of a buffer from rows start to stop of the board, according to the topology.
+    Only the border cells are written, so wrapping the board costs its perimeter rather than its area.
+    A dead border is never written, and stays dead from when the buffer was allocated.
+
+    :param buffer: A board with a one cell wide border around it, or a stack of them
+    :param topology: One of TOPOLOGIES
+    :param start: The first row of the board the padding is refreshed from
+    :param stop: The end row of the board the padding is refreshed from, None meaning the last row
+    :return: None
+    """
+
+    if topology == "dead":
+        return
+
+    h = buffer.shape[-2] - 2
+    if stop is None:
+        stop = h
+
+    rows = slice(1 + start, 1 + stop)
+
+    # The columns first, so the rows copied below carry the corners along with them
+    if topology == "mirror":
+        buffer[..., rows, 0] = buffer[..., rows, 1]
+        buffer[..., rows, -1] = buffer[..., rows, -2]
+    else:
+        buffer[..., rows, 0] = buffer[..., rows, -2]
+        buffer[..., rows, -1] = buffer[..., rows, 1]
+
+    if topology == "mirror":
+        if start == 0:
+            buffer[..., 0, :] = buffer[..., 1, :]
+        if stop == h:
+            buffer[..., -1, :] = buffer[..., -2, :]
+
+    elif topology == "torus":
+        if start == 0:
+            buffer[..., -1, :] = buffer[..., 1, :]
+        if stop == h:
+            buffer[..., 0, :] = buffer[..., -2, :]
+
+    # A Klein bottle joins the top and bottom edge the other way around
+    else:
+        if start == 0:
+            buffer[..., -1, :] = buffer[..., 1, ::-1]
+        if stop == h:
+            buffer[..., 0, :] = buffer[..., -2, ::-1]
+
+
+def step(views: List[np.ndarray], old: np.ndarray, new: np.ndarray, counts: np.ndarray, masks: np.ndarray,
+         table: np.ndarray):
+    """
+    Calculate the next generation of a region of cells, under the rule compiled into the lookup table.
+    All arrays are the same shape, and everything is computed in place, so nothing is allocated.
+
+    :param views: The eight neighbor views of the region, as given by neighbor_views
+    :param old: The current generation of the region
+    :param new: The array to write the next generation of the region into
+    :param counts: A uint8 scratch array, which afterwards is non-zero for every cell that changed
+    :param masks: A uint16 scratch array, holding the row of the lookup table of every cell
+    :param table: The lookup table of the rule, as given by lookup_table
+    :return: None
+    """
+
+    first, second, *rest = views
+
+    np.add(first, second, out=counts)
+    for view in rest:
+        np.add(counts, view, out=counts)
+
+    # Pick the row of the table by the state of the cell, as dead ^ (state * (dead ^ alive)),
+    # and look the next state up in it by shifting it by the neighbor count.
+    # Every rule runs through the same operations, so every rule runs at the same speed.
+    np.multiply(old, table[0] ^ table[1], out=masks)
+    np.bitwise_xor(masks, table[0], out=masks)
+    np.right_shift(masks, counts, out=masks)
+    np.bitwise_and(masks, 1, out=new, casting="unsafe")
+
+    np.not_equal(new, old, out=counts)
@@ -6,14 +6,16 @@ This file modifies the config.json file, which in turn is used by the entire pro
 import pygame
 
 import fonts
+import engines
+import rules
 from config import config
-from ui_elements import Button, TextField, InputBox, Toggle, InputGroup
+from ui_elements import Button, TextField, InputBox, Toggle, InputGroup, Choice
 
 
 class Settings:
     def __init__(self, window):
         self.window = window
-        self.window.resize(int(self.window.scale_x(700)), int(self.window.scale_y(900)), False)
+        self.window.resize(int(self.window.scale_x(700)), int(self.window.scale_y(1020)), False)
         self.window.set_caption("Settings - Game of Life")
         self.clock = pygame.time.Clock()
 
@@ -29,6 +31,9 @@ class Settings:
             "GAME SETTINGS",
             "Width:",
             "Height:",
+            "Engine:",
+            "Rule:",
+            "Topology:",
             "",
             "ANIMATION SETTINGS",
             "Game-speed:",
@@ -50,6 +55,15 @@ class Settings:
         for text, i in zip(text_contents, range(len(text_contents))):
             self.text_fields.append(TextField(text, pos=self.window.scale_xy(20, i * 40 + 35), **text_default))
 
+        # The reason the game settings were not saved, shown in the empty line below them
+        self.error_field = TextField(
+            "",
+            fonts.main,
+            self.window.scale_xy(20, 6 * 40 + 35),
+            "cl",
+            text_color=(220, 20, 20)
+        )
+
         self.input_fields = []
         self._load_config()
 
@@ -60,7 +74,7 @@ class Settings:
             fonts.main,
             config.color_buttons,
             self.exit,
-            self.window.scale_rect((60, 800, 180, 80)),
+            self.window.scale_rect((60, 920, 180, 80)),
             "tl",
             text_color=config.color_buttons_text,
             border_color=config.color_buttons_border
@@ -71,7 +85,7 @@ class Settings:
             fonts.main,
             config.color_buttons,
             self.save,
-            self.window.scale_rect((260, 800, 180, 80)),
+            self.window.scale_rect((260, 920, 180, 80)),
             "tl",
             text_color=config.color_buttons_text,
             border_color=config.color_buttons_border
@@ -82,7 +96,7 @@ class Settings:
             fonts.main,
             config.color_buttons,
             self.reset,
-            self.window.scale_rect((460, 800, 180, 80)),
+            self.window.scale_rect((460, 920, 180, 80)),
             "tl",
             text_color=config.color_buttons_text,
             border_color=config.color_buttons_border
@@ -108,6 +122,14 @@ class Settings:
 
         self.input_fields.clear()
 
+        # The config entries edited by the input fields, in the same order as the fields
+        self.input_keys = [
+            "w", "h", "engine", "rule", "topology",
+            "game_speed", "animate_master", "animate_count", "animate_speed",
+            "color_bg", "color_cell_alive", "color_cell_dead", "color_grid",
+            "color_buttons", "color_buttons_border", "color_buttons_text", "color_text"
+        ]
+
         self.input_fields.append(InputBox(
             config.w,
             int,
@@ -130,12 +152,50 @@ class Settings:
             border_color=config.color_buttons_border
         ))
 
+        self.engine_field = Choice(
+            engines.ENGINES,
+            fonts.main,
+            (240, 240, 240),
+            self.window.scale_rect((680, 155, 200, 38)),
+            "cr",
+            border_color=config.color_buttons_border,
+            text_color=config.color_buttons_text,
+            value=config.engine
+        )
+        self.input_fields.append(self.engine_field)
+
+        # The rule is checked as a whole when saving, while typing only the characters of B/S notation are let through
+        self.rule_field = InputBox(
+            config.rule,
+            str,
+            fonts.main,
+            (240, 240, 240),
+            self.window.scale_rect((680, 195, 200, 38)),
+            "cr",
+            allowed="BbSs/012345678",
+            text_color=config.color_buttons_text,
+            border_color=config.color_buttons_border
+        )
+        self.input_fields.append(self.rule_field)
+
+        self.topology_field = Choice(
+            rules.TOPOLOGIES,
+            fonts.main,
+            (240, 240, 240),
+            self.window.scale_rect((680, 235, 200, 38)),
+            "cr",
+            border_color=config.color_buttons_border,
+            text_color=config.color_buttons_text,
+            value=config.topology
+        )
+        self.input_fields.append(self.topology_field)
+
         self.input_fields.append(InputBox(
             config.game_speed,
             float,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 235, 100, 38)),
+            self.window.scale_rect((680, 355, 100, 38)),
             "cr",
             text_color=config.color_buttons_text,
             border_color=config.color_buttons_border
@@ -144,7 +204,7 @@ class Settings:
         self.input_fields.append(Toggle(
             fonts.main,
             config.color_buttons_border,
-            self.window.scale_rect((680, 275, 200, 38)),
+            self.window.scale_rect((680, 395, 200, 38)),
             "cr",
             border_color=config.color_buttons_border,
             enabled=config.animate_master
@@ -155,7 +215,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 315, 100, 38)),
+            self.window.scale_rect((680, 435, 100, 38)),
             "cr",
             text_color=config.color_buttons_text,
             border_color=config.color_buttons_border
@@ -166,7 +226,7 @@ class Settings:
             float,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 355, 100, 38)),
+            self.window.scale_rect((680, 475, 100, 38)),
             "cr",
             text_color=config.color_buttons_text,
             border_color=config.color_buttons_border
@@ -177,7 +237,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 475, 244, 38)),
+            self.window.scale_rect((680, 595, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -189,7 +249,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 515, 244, 38)),
+            self.window.scale_rect((680, 635, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -201,7 +261,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 555, 244, 38)),
+            self.window.scale_rect((680, 675, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -213,7 +273,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 595, 244, 38)),
+            self.window.scale_rect((680, 715, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -225,7 +285,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 635, 244, 38)),
+            self.window.scale_rect((680, 755, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -237,7 +297,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 675, 244, 38)),
+            self.window.scale_rect((680, 795, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -249,7 +309,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 715, 244, 38)),
+            self.window.scale_rect((680, 835, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -261,7 +321,7 @@ class Settings:
             int,
             fonts.main,
             (240, 240, 240),
-            self.window.scale_rect((680, 755, 244, 38)),
+            self.window.scale_rect((680, 875, 244, 38)),
             "cr",
             padding=2,
             text_color=config.color_buttons_text,
@@ -271,16 +331,70 @@ class Settings:
     def reset(self):
         config.reset()
         self._load_config()
+        self.show_error("")
 
     def exit(self):
         self.running = False
         self.window.resize(None, None, True)
         self.window.set_caption("Game of Life")
 
+    def show_error(self, text: str):
+        """
+        Show why the settings were not saved, or clear the reason with an empty string.
+
+        :param text: The reason
+        :return: None
+        """
+
+        self.error_field.text = text
+        self.error_field.create_text()
+
+    def validate(self) -> bool:
+        """
+        Check the rule parses, and the engine can run it and the topology.
+        The fields at fault are marked invalid, and the reason is shown, until they are changed.
+
+        :return: Whether the settings can be saved
+        """
+
+        for field in (self.engine_field, self.rule_field, self.topology_field):
+            field.invalid = False
+
+        try:
+            birth, _ = rules.parse(self.rule_field.text)
+        except ValueError:
+            self.rule_field.invalid = True
+            self.show_error("Rule is not in B/S notation")
+            return False
+
+        try:
+            engines.ENGINES[self.engine_field.value].check(self.rule_field.text, self.topology_field.value)
+        except ValueError:
+            # An unbounded engine runs neither rules with B0, nor topologies other than dead
+            self.engine_field.invalid = True
+
+            if 0 in birth:
+                self.rule_field.invalid = True
+                self.show_error(f"{self.engine_field.value} can not run B0")
+            else:
+                self.topology_field.invalid = True
+                self.show_error(f"{self.engine_field.value} can not run {self.topology_field.value}")
+
+            return False
+
+        self.show_error("")
+        return True
+
     def save(self):
-        # Iterate over all config entries in config, and reassign their values
-        for i, conf in enumerate(config.content.keys()):
-            config.content[conf] = self.input_fields[i].value
+        # Settings the game could not start with are marked, rather than saved
+        if not self.validate():
+            return
+
+        self.rule_field.text = self.rule_field.text.upper()
+
+        # Iterate over the config entries that have an input field, and reassign their values
+        for conf, input_field in zip(self.input_keys, self.input_fields):
+            config.content[conf] = input_field.value
 
         # Save entire config
         config.save()
@@ -291,6 +405,8 @@ class Settings:
         for text_field in self.text_fields:
             text_field.render(self.window.window)
 
+        self.error_field.render(self.window.window)
+
         for input_field in self.input_fields:
             input_field.render(self.window.window)
 
@@ -0,0 +1,219 @@
+"""
+This file contains the simulation class, which owns the board and advances it a generation at a time.
+The game class draws and edits the board of a simulation, and the command line runner steps one without a window.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import numpy as np
+from typing import Tuple
+
+import engines
+import rules
+from hashlife import HashLife
+from cycles import CycleDetector
+from trajectories import TrajectoryCache
+
+
+class Simulation:
+    # The simulation runs in the process of the game, unlike worker.SimulationProcess
+    remote = False
+
+    def __init__(
+            self,
+            w: int,
+            h: int,
+            engine: str = "numpy",
+            rule: str = rules.CONWAY,
+            topology: str = "dead",
+            workers: int = 0,
+            hashlife_memory: int = 256,
+            cycle_history: int = 1024,
+            trajectory_memory: int = 64,
+            trajectory_directory: str = "",
+            trajectory_disk: int = 256
+    ):
+        """
+        Initialize an empty board, and the engines stepping it.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        :param engine: The registered name of the engine stepping the board
+        :param rule: The rule the board is stepped by, as a rulestring in B/S notation
+        :param topology: What lies past the edges of the board, one of rules.TOPOLOGIES
+        :param workers: The amount of threads or processes used by the parallel engines, 0 sizing it from the CPU count
+        :param hashlife_memory: The memory in megabytes the HashLife engines may use
+        :param cycle_history: The amount of recent generations remembered to notice the board repeating itself
+        :param trajectory_memory: The memory in megabytes the remembered generations may use
+        :param trajectory_directory: The directory to save the remembered generations in, if any
+        :param trajectory_disk: The disk space in megabytes the saved generations may use
+        """
+
+        self.w = w
+        self.h = h
+        self.rule = rule
+        self.topology = topology
+
+        # The engine steps the board, the simulation keeps its own copy of the map for editing and rendering
+        self.engine = engines.create(
+            engine,
+            w,
+            h,
+            rule=rule,
+            topology=topology,
+            workers=workers,
+            memory_limit=hashlife_memory
+        )
+        self.map: np.ndarray = np.zeros((h, w), dtype="uint8")
+
+        # Whether the map has been edited since it was last loaded into the engine
+        self.edited = True
+
+        # Whether the engine is behind the map, as the generations since it was loaded have been replayed
+        self.behind = False
+
+        # The generations since the map was last edited, and the live cells, births and deaths of the last one.
+        # The population is counted when the map is loaded, and kept up from the changed cells after that.
+        self.generation = 0
+        self.population = 0
+        self.births = 0
+        self.deaths = 0
+
+        # The HashLife universe used to jump far ahead, kept so its memo carries over between jumps.
+        # HashLife can not run rules with B0 or wrapping topologies, in which case jumping is disabled.
+        try:
+            self.hashlife = HashLife(w, h, hashlife_memory, rule=rule, topology=topology)
+        except ValueError:
+            self.hashlife = None
+
+        # The detector notices when the board starts repeating itself, after which the cycle is replayed.
+        # On an unbounded board the map can repeat while the cells past its edges do not, so nothing is detected.
+        self.cycles = CycleDetector(0 if self.engine.unbounded else cycle_history)
+        self.cycles.reset(self.map)
+
+        # The cache remembers the generations computed from every starting board, so running it again replays them.
+        # On an unbounded board the cells past the edges of the map would be lost once the engine catches up with it,
+        # so nothing is remembered.
+        if self.engine.unbounded:
+            self.trajectories = TrajectoryCache(0)
+        else:
+            self.trajectories = TrajectoryCache(trajectory_memory, trajectory_directory, trajectory_disk)
+        self.trajectory = None
+
+    def clear(self):
+        """
+        Clear the map of marked cells
+
+        :return: None
+        """
+
+        self.map.fill(0)
+        self.edited = True
+
+    def jump(self, generations: int) -> bool:
+        """
+        Jump generations ahead, using the HashLife engine.
+        The universe is unbounded while jumping, so cells that leave the map are cut off afterwards.
+
+        :param generations: The amount of generations to jump
+        :return: Whether the jump was made, which it is not if HashLife can not run the rule or topology
+        """
+
+        if self.hashlife is None:
+            return False
+
+        # An edited board starts counting from 0, and is only loaded into the engine once jumped
+        if self.edited:
+            self.generation = 0
+            self.edited = False
+
+        self.hashlife.load(self.map)
+        self.hashlife.advance(generations)
+        self.hashlife.export(self.map)
+
+        # The generations go on counting from before the jump, while the board is new to the engine and the detector
+        self.generation += generations
+        self.population = int(np.count_nonzero(self.map))
+        self.restart()
+
+        return True
+
+    def restart(self):
+        """
+        Start over from the map, which has been edited or jumped to since it was last stepped.
+        Its trajectory is opened, and the detector is reset to its generation, while the engine is loaded once needed.
+
+        :return: None
+        """
+
+        self.trajectory = self.trajectories.open(self.map, self.rule, self.topology)
+        self.cycles.reset(self.map, self.generation)
+        self.behind = True
+
+    def tick(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the next generation.
+        The engine steps the board, and the cells it reports as changed are flipped in the map,
+        so the map stays in sync without being copied. If the map has been edited, its trajectory is opened,
+        and the generations computed from it before are replayed, before the engine is loaded and stepped further.
+
+        :return: The row and column indexes of the cells that changed, as two np.ndarrays
+        """
+
+        if self.edited:
+            self.edited = False
+            self.generation = 0
+            self.population = int(np.count_nonzero(self.map))
+            self.restart()
+
+        # Once the board repeats itself, the engine is left alone and the generations are replayed from the cycle
+        if self.cycles.replaying:
+            rows, cols = self.cycles.replay()
+            self.map[rows, cols] ^= 1
+
+        # Generations computed from this board before are replayed, leaving the engine behind
+        elif self.trajectory.replayable:
+            rows, cols = self.trajectory.replay()
+            self.map[rows, cols] ^= 1
+            self.cycles.record(self.map, (rows, cols))
+
+        else:
+            # The engine catches up with the map once, where the stored generations run out
+            if self.behind:
+                self.engine.load(self.map)
+                self.behind = False
+
+            self.engine.step()
+            rows, cols = self.engine.changed()
+            self.map[rows, cols] ^= 1
+            self.trajectory.append((rows, cols))
+            self.cycles.record(self.map, (rows, cols))
+
+        # The changed cells that are alive now were born, the others died
+        self.births = int(np.count_nonzero(self.map[rows, cols]))
+        self.deaths = len(rows) - self.births
+        self.population += self.births - self.deaths
+        self.generation += 1
+
+        return rows, cols
+
+    def status(self) -> str:
+        """
+        Describe the state of the board.
+
+        :return: The generation, or the generation the cycle starts at and its period once the board repeats itself
+        """
+
+        if self.cycles.stable:
+            return f"stable, period {self.cycles.period} from gen {self.cycles.start}"
+
+        return f"generation {self.generation}"
+
+    def close(self):
+        """
+        Close the engine, stopping any workers it uses, and save the trajectories computed.
+
+        :return: None
+        """
+
+        self.engine.close()
+        self.trajectories.close()
@@ -0,0 +1,85 @@
+"""
+This file contains the statistics log, which appends a record of every generation to a JSON Lines or CSV file.
+Records are formatted by hand and written through a large buffer, so logging costs little per generation.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import os
+
+# The fields of every record, in the order they are written
+FIELDS = ("generation", "population", "births", "deaths", "changed", "tick_ms", "render_ms")
+
+# The size of the write buffer in bytes, which holds thousands of records between writes to the file
+BUFFER_SIZE = 1024 * 1024
+
+
+class StatsLog:
+    def __init__(self, path: str):
+        """
+        Open a log, appending to the file if it exists. The format is picked by the extension, .csv being CSV,
+        and anything else JSON Lines. A CSV file is given a header when it is created.
+
+        :param path: The path of the file
+        """
+
+        self.path = path
+        self.csv = path.lower().endswith(".csv")
+
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", buffering=BUFFER_SIZE)
+
+        if self.csv and new:
+            self.file.write(",".join(FIELDS) + "\n")
+
+    def write(
+            self,
+            generation: int,
+            population: int,
+            births: int,
+            deaths: int,
+            tick_seconds: float,
+            render_seconds: float = None
+    ):
+        """
+        Append the record of a generation.
+
+        :param generation: The generation
+        :param population: The live cells
+        :param births: The cells born
+        :param deaths: The cells that died
+        :param tick_seconds: The time the generation took to calculate
+        :param render_seconds: The time it took to render, None if it was not rendered
+        :return: None
+        """
+
+        tick_ms = f"{tick_seconds * 1000:.4f}"
+
+        if self.csv:
+            render_ms = "" if render_seconds is None else f"{render_seconds * 1000:.4f}"
+            self.file.write(
+                f"{generation},{population},{births},{deaths},{births + deaths},{tick_ms},{render_ms}\n"
+            )
+        else:
+            render_ms = "null" if render_seconds is None else f"{render_seconds * 1000:.4f}"
+            self.file.write(
+                f'{{"generation": {generation}, "population": {population}, "births": {births}, '
+                f'"deaths": {deaths}, "changed": {births + deaths}, "tick_ms": {tick_ms}, "render_ms": {render_ms}}}\n'
+            )
+
+    def flush(self):
+        """
+        Write the buffered records to the file.
+
+        :return: None
+        """
+
+        self.file.flush()
+
+    def close(self):
+        """
+        Write the buffered records and close the file.
+
+        :return: None
+        """
+
+        self.file.close()
@@ -0,0 +1,235 @@
+"""
+This file contains the trajectory cache, which remembers the generations computed from a starting board,
+so running the same board again replays them rather than computing them anew.
+Trajectories are kept in memory, least recently used first out, and optionally saved to a directory on disk.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import os
+import zlib
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from typing import List, Tuple
+
+# The way the changed cells are stored, which is part of the keys so trajectories saved another way are never read
+FORMAT = "indexes"
+
+
+class Trajectory:
+    def __init__(self, key: str, shape: Tuple[int, int], limit: int, diffs: List[bytes] = None):
+        """
+        The generations computed from a starting board, stored as the compressed indexes of the cells that changed,
+        so storing and replaying a generation costs as much as its changes, however large the board is.
+
+        :param key: The key of the starting board, as given by TrajectoryCache.key
+        :param shape: The shape of the board
+        :param limit: The amount of bytes the trajectory may grow to, after which generations are no longer stored
+        :param diffs: The compressed indexes of the generations computed before, if any
+        """
+
+        self.key = key
+        self.shape = shape
+        self.limit = limit
+        self.diffs = diffs if diffs is not None else []
+        self.nbytes = sum(len(diff) for diff in self.diffs)
+
+        # The generation the board is at, which is replayed while it is behind the stored generations
+        self.position = 0
+
+    @property
+    def replayable(self) -> bool:
+        """
+        Whether the next generation has been stored before.
+
+        :return: Whether the next generation can be replayed
+        """
+
+        return self.position < len(self.diffs)
+
+    def append(self, changed: Tuple[np.ndarray, np.ndarray]):
+        """
+        Store the next generation, by the cells that changed to get there.
+
+        :param changed: The row and column indexes of the changed cells
+        :return: None
+        """
+
+        self.position += 1
+
+        if self.nbytes >= self.limit:
+            return
+
+        # The indexes into the flattened board fit in 32 bits for any board that fits in memory
+        cells = np.ravel_multi_index(changed, self.shape).astype("<i4")
+        diff = zlib.compress(cells.tobytes(), 1)
+
+        self.diffs.append(diff)
+        self.nbytes += len(diff)
+
+    def replay(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Advance one generation along the stored generations.
+
+        :return: The row and column indexes of the cells that change, as two np.ndarrays
+        """
+
+        cells = np.frombuffer(zlib.decompress(self.diffs[self.position]), dtype="<i4")
+
+        self.position += 1
+
+        return np.unravel_index(cells, self.shape)
+
+
+class TrajectoryCache:
+    def __init__(self, memory_limit: int = 64, directory: str = "", disk_limit: int = 256):
+        """
+        Initialize an empty cache.
+
+        :param memory_limit: The memory in megabytes the trajectories in memory may use
+        :param directory: The directory to save the trajectories in, an empty string keeping them in memory only
+        :param disk_limit: The disk space in megabytes the saved trajectories may use
+        """
+
+        self.memory_limit = memory_limit * 1024 * 1024
+        self.directory = directory
+        self.disk_limit = disk_limit * 1024 * 1024
+
+        # The trajectories in memory, least recently used first
+        self.trajectories: "OrderedDict[str, Trajectory]" = OrderedDict()
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(board: np.ndarray, *variant: str) -> str:
+        """
+        Hash a starting board, together with everything else that decides the generations following it.
+
+        :param board: The starting board, as a C-contiguous np.ndarray
+        :param variant: The rule, topology and such, as strings
+        :return: The key of the trajectory
+        """
+
+        digest = hashlib.blake2b(board, digest_size=16)
+        digest.update(repr((board.shape, variant, FORMAT)).encode())
+
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        The file a trajectory is saved in.
+
+        :param key: The key of the trajectory
+        :return: The path of the file
+        """
+
+        return os.path.join(self.directory, key + ".npz")
+
+    def open(self, board: np.ndarray, *variant: str) -> Trajectory:
+        """
+        Open the trajectory of a starting board, found in memory, on disk or else started empty.
+
+        :param board: The starting board, as a C-contiguous np.ndarray
+        :param variant: The rule, topology and such, as strings
+        :return: The trajectory, at generation 0
+        """
+
+        key = self.key(board, *variant)
+
+        if key in self.trajectories:
+            trajectory = self.trajectories.pop(key)
+
+        elif self.directory and os.path.exists(self.path(key)):
+            trajectory = self.load(key, board.shape)
+
+        else:
+            trajectory = Trajectory(key, board.shape, self.memory_limit)
+
+        trajectory.position = 0
+
+        # Re-inserting the trajectory marks it as the most recently used
+        self.trajectories[key] = trajectory
+        self.evict()
+
+        return trajectory
+
+    def evict(self):
+        """
+        Drop the least recently used trajectories from memory, until they fit the memory limit.
+        The most recently used trajectory is always kept, as it is the one being run.
+
+        :return: None
+        """
+
+        while len(self.trajectories) > 1 and sum(t.nbytes for t in self.trajectories.values()) > self.memory_limit:
+            _, trajectory = self.trajectories.popitem(last=False)
+            self.save(trajectory)
+
+    def load(self, key: str, shape: Tuple[int, int]) -> Trajectory:
+        """
+        Load a trajectory from disk, marking its file as recently used.
+
+        :param key: The key of the trajectory
+        :param shape: The shape of the board
+        :return: The trajectory
+        """
+
+        path = self.path(key)
+
+        with np.load(path) as data:
+            offsets = data["offsets"].tolist()
+            blob = data["data"].tobytes()
+
+        os.utime(path)
+
+        diffs = [blob[start:stop] for start, stop in zip(offsets, offsets[1:])]
+        return Trajectory(key, shape, self.memory_limit, diffs)
+
+    def save(self, trajectory: Trajectory):
+        """
+        Save a trajectory to disk, if a directory is set and it has grown since it was last saved,
+        then remove the least recently used files until they fit the disk limit.
+
+        :param trajectory: The trajectory to save
+        :return: None
+        """
+
+        if not self.directory or not trajectory.diffs:
+            return
+
+        path = self.path(trajectory.key)
+
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if len(data["offsets"]) - 1 >= len(trajectory.diffs):
+                    return
+
+        offsets = np.cumsum([0] + [len(diff) for diff in trajectory.diffs])
+        data = np.frombuffer(b"".join(trajectory.diffs), dtype="uint8")
+
+        # Write to a temporary file first, so a crash never leaves a half written trajectory behind
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, offsets=offsets, data=data)
+        os.replace(path + ".tmp", path)
+
+        files = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".npz")]
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+
+        for entry in files:
+            if total <= self.disk_limit or entry.path == path:
+                break
+
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+
+    def close(self):
+        """
+        Save every trajectory in memory to disk.
+
+        :return: None
+        """
+
+        for trajectory in self.trajectories.values():
+            self.save(trajectory)
@@ -254,6 +254,113 @@ class Toggle(pygame.Rect):
         self.off_label.render(surface)
 
 
+class Choice(pygame.Rect):
+    def __init__(self,
+                 options: Iterable,
+                 font: pygame.font.Font,
+                 color: Tuple[int, int, int],
+                 rect: Tuple[float, float, float, float],
+                 alignment: str = "cc",
+                 corner_round: int = 2,
+                 border_width: int = 2,
+                 border_color: Tuple[int, int, int] = None,
+                 border_color_invalid: Tuple[int, int, int] = None,
+                 text_color: Tuple[int, int, int] = None,
+                 value=None
+                 ):
+        """
+        This class emulates a selector,
+        cycling through a fixed set of options when pressed.
+
+        :param options: The options to choose between
+        :param font: The font used to display the chosen option
+        :param color: The color of the box
+        :param rect: The rect of the box
+        :param alignment: The alignment to use
+        :param corner_round: The amount of corner rounding
+        :param border_width: The width of the border
+        :param border_color: The color of the border
+        :param border_color_invalid: The color of the border when marked invalid
+        :param text_color: The color of the text
+        :param value: The option chosen initially, defaults to the first
+        """
+
+        # Initialize the super, in this case the container rect
+        super().__init__(*rect)
+
+        # Save all of the variables used in the class
+        self.options = list(options)
+        self.font = font
+        self.color = color
+        self.corner_round = corner_round
+        self.border_width = border_width
+
+        # If no border_color specified, default
+        self.border_color = border_color
+        if not border_color:
+            self.border_color = (0, 0, 0)
+
+        # If no border_color_invalid specified, default
+        self.border_color_invalid = border_color_invalid
+        if not border_color_invalid:
+            self.border_color_invalid = (220, 20, 20)
+
+        # If no text_color specified, default
+        self.text_color = text_color
+        if not text_color:
+            self.text_color = (0, 0, 0)
+
+        # Align the rect according to alignment
+        align(self, alignment)
+
+        # Whether the option was rejected on saving, until another option is chosen
+        self.invalid = False
+
+        # Start on the given option, if it is one of the options
+        self.index = self.options.index(value) if value in self.options else 0
+
+        # Initialize the label showing the chosen option
+        self.label = TextField(str(self.value), self.font, self.center, text_color=self.text_color)
+
+    def collidepoint(self, x: float, y: float) -> bool:
+        """
+        This function moves on to the next option when pressed.
+        :param x: The x coordinate of the mouse
+        :param y: The y coordinate of the mouse
+        :return: Boolean representing collision
+        """
+
+        if super().collidepoint(x, y):
+            self.index = (self.index + 1) % len(self.options)
+            self.invalid = False
+
+            # Update the label to the new option
+            self.label.text = str(self.value)
+            self.label.create_text()
+
+            return True
+
+        return False
+
+    @property
+    def value(self):
+        return self.options[self.index]
+
+    def render(self, surface: pygame.Surface):
+        """
+        Render the box, its border and the label of the chosen option.
+        :param surface: The pygame.Surface to draw on
+        :return: None
+        """
+
+        pygame.draw.rect(surface, self.color, self, 0, self.corner_round)
+
+        border_color = self.border_color_invalid if self.invalid else self.border_color
+        pygame.draw.rect(surface, border_color, self, self.border_width, self.corner_round)
+
+        self.label.render(surface)
+
+
 class Button(pygame.Rect):
     def __init__(self,
                  text: str,
@@ -459,7 +566,9 @@ class InputBox(pygame.Rect):
                  border_width: int = 2,
                  border_color: Tuple[int, int, int] = None,
                  border_color_activated: Tuple[int, int, int] = None,
-                 text_color: Tuple[int, int, int] = None
+                 border_color_invalid: Tuple[int, int, int] = None,
+                 text_color: Tuple[int, int, int] = None,
+                 allowed: str = None
                  ):
         """
         This class acts as an abstraction of all code involved in creating an input container.
@@ -477,7 +586,9 @@ class InputBox(pygame.Rect):
         :param border_width: An int on the width of the border
         :param border_color: A tuple on the color of the border
         :param border_color_activated: A tuple on the color of the border when activated
+        :param border_color_invalid: A tuple on the color of the border when marked invalid
         :param text_color: A tuple on the color of the text
+        :param allowed: The characters allowed if str, None allowing any
         """
 
         # Call the super init to initialize the rect
@@ -488,6 +599,7 @@ class InputBox(pygame.Rect):
         self.content_type = content_type
         self.lower = lower
         self.upper = upper
+        self.allowed = allowed
         self.font = font
         self.color = color
         self.corner_round = corner_round
@@ -495,6 +607,9 @@ class InputBox(pygame.Rect):
         self.alignment = alignment
         self.activated = False
 
+        # Whether the value was rejected on saving, until the box is pressed again
+        self.invalid = False
+
         if not self.check():
             raise ValueError("InputBox failed initial value check, ensure correct content_type")
 
@@ -508,6 +623,11 @@ class InputBox(pygame.Rect):
         if not self.border_color_activated:
             self.border_color_activated = (220, 20, 20)
 
+        # Default if no border_color_invalid specified
+        self.border_color_invalid = border_color_invalid
+        if not self.border_color_invalid:
+            self.border_color_invalid = (220, 20, 20)
+
         # Default if no text_color specified
         self.text_color = text_color
         if not text_color:
@@ -528,6 +648,7 @@ class InputBox(pygame.Rect):
         # Call the super collidepoint function
         if super().collidepoint(x, y):
             self.activated = not self.activated
+            self.invalid = False
 
             # If not already activated, activate and return send_keys
             if self.activated:
@@ -581,9 +702,20 @@ class InputBox(pygame.Rect):
 
         return self.lower <= float(self.text) <= self.upper
 
+    def check_str(self) -> bool:
+        """
+        Check whether the text content is valid for str type
+        :return: The validity as a bool
+        """
+
+        if self.allowed is None:
+            return True
+
+        return all(char in self.allowed for char in self.text)
+
     # A dict used to jump to the correct checker, can be expanded
     checks = {
-        str: lambda self: True,
+        str: check_str,
         int: check_int,
         float: check_float
     }
@@ -639,7 +771,15 @@ class InputBox(pygame.Rect):
 
         # Draw the button and it's border
         pygame.draw.rect(surface, self.color, self, 0, self.corner_round)
-        pygame.draw.rect(surface, self.border_color_activated if self.activated else self.border_color, self, self.border_width, self.corner_round)
+
+        if self.activated:
+            border_color = self.border_color_activated
+        elif self.invalid:
+            border_color = self.border_color_invalid
+        else:
+            border_color = self.border_color
+
+        pygame.draw.rect(surface, border_color, self, self.border_width, self.corner_round)
 
         # Create the text surface
         text_surf = self.font.render(self.text, True, self.text_color)
@@ -3,10 +3,24 @@ This is a small file containing a class that simplifies creating and interacting
 """
 
 import pygame
-from screeninfo import get_monitors
+from screeninfo import get_monitors, Monitor, ScreenInfoError
 from typing import Tuple
 
 
+def primary_monitor() -> Monitor:
+    """
+    Get the primary monitor, which the ui is scaled to.
+    Without a display, such as under SDL_VIDEODRIVER=dummy, a monitor of the 1920x1080 layout size is assumed.
+
+    :return: The monitor
+    """
+
+    try:
+        return get_monitors()[0]
+    except ScreenInfoError:
+        return Monitor(0, 0, 1920, 1080)
+
+
 class Window:
     def __init__(self, width: int = None, height: int = None, fullscreen: bool = True):
         """
@@ -21,7 +35,7 @@ class Window:
             pygame.init()
 
         # Get the monitor
-        self.monitor = get_monitors()[0]
+        self.monitor = primary_monitor()
 
         self.width = None
         self.height = None
@@ -0,0 +1,460 @@
+"""
+This file contains the simulation process, which runs a simulation in a worker process,
+publishing the generations it calculates into a triple buffer in shared memory.
+The game draws the newest complete frame straight from the shared buffer, and sends its commands over a queue,
+so drawing and input handling keep their pace however long a generation takes.
+It does not depend on pygame, so it can be used without a window.
+"""
+
+import time
+import queue
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from typing import Optional, Tuple
+
+from engines import TILE_SIZE
+from simulation import Simulation
+from stats import StatsLog
+
+# The amount of frames in the shared buffer: the newest, the one being drawn and the one being written
+SLOTS = 3
+
+# The fields kept for every frame in the header, after the indexes of the slots
+GENERATION, POPULATION, BIRTHS, DEATHS, START, PERIOD, TICK_NS = range(7)
+FIELDS = 7
+
+# The indexes of the slots in the header: the newest frame, the frame being drawn and the frame drawn before it
+LATEST, READING, PREVIOUS = range(3)
+
+# The seconds waited for a reply at a time, before checking the worker is still alive
+REPLY_TIMEOUT = 0.5
+
+# The seconds the worker is given to stop, before it is terminated
+STOP_TIMEOUT = 5
+
+
+def serve(name: str, h: int, w: int, options: dict, stats_log: str, frame_rate: float,
+          commands, replies, header, dirty, lock):
+    """
+    The main function of the worker process, running the simulation and publishing its frames until told to stop.
+
+    :param name: The name of the shared memory block of the frames
+    :param h: The height of the board
+    :param w: The width of the board
+    :param options: The options of the simulation.Simulation
+    :param stats_log: The file to log every generation to, an empty string logging nothing
+    :param frame_rate: The most frames published per second when running unpaced
+    :param commands: The queue of commands from the game
+    :param replies: The queue of replies to the commands that wait for one
+    :param header: A shared array of the slot indexes and the fields of every frame
+    :param dirty: A shared array of the tiles changed since the game last picked up a frame
+    :param lock: The lock guarding the slot indexes and the changed tiles
+    :return: None
+    """
+
+    block = SharedMemory(name=name)
+    frames = np.ndarray((SLOTS, h, w), dtype="uint8", buffer=block.buf)
+
+    # The tiles changed since the last frame published, added to the shared ones with every frame
+    tiles = np.frombuffer(dirty, dtype="bool").reshape(-(-h // TILE_SIZE), -(-w // TILE_SIZE))
+    changed = np.zeros_like(tiles)
+
+    simulation = Simulation(w, h, **options)
+    log = StatsLog(stats_log) if stats_log else None
+
+    def publish():
+        # Write into a slot that is neither the newest nor held by the game, waiting for the game if there is none
+        while True:
+            with lock:
+                held = {header[LATEST], header[READING], header[PREVIOUS]}
+            free = [slot for slot in range(SLOTS) if slot not in held]
+            if free:
+                break
+            time.sleep(0.0005)
+
+        slot = free[0]
+        frames[slot] = simulation.map
+
+        fields = SLOTS + slot * FIELDS
+        header[fields + GENERATION] = simulation.generation
+        header[fields + POPULATION] = simulation.population
+        header[fields + BIRTHS] = simulation.births
+        header[fields + DEATHS] = simulation.deaths
+        header[fields + START] = simulation.cycles.start or 0
+        header[fields + PERIOD] = simulation.cycles.period or 0
+        header[fields + TICK_NS] = tick_ns
+
+        with lock:
+            header[LATEST] = slot
+            np.bitwise_or(tiles, changed, out=tiles)
+
+        changed.fill(False)
+
+    def tick() -> int:
+        start = time.perf_counter_ns()
+        rows, cols = simulation.tick()
+        seconds = time.perf_counter_ns() - start
+
+        changed[rows // TILE_SIZE, cols // TILE_SIZE] = True
+
+        if log is not None:
+            log.write(simulation.generation, simulation.population, simulation.births, simulation.deaths, seconds / 1e9)
+
+        return seconds
+
+    running = False
+    rate = 0.0
+    tick_ns = 0
+    due = published = time.perf_counter()
+
+    while True:
+        # While paused the worker sleeps on the queue, while paced it sleeps on it until the next generation is due
+        try:
+            if not running:
+                command = commands.get()
+            elif rate:
+                command = commands.get(timeout=max(0.0, due - time.perf_counter()))
+            else:
+                command = commands.get_nowait()
+        except queue.Empty:
+            command = None
+
+        if command is not None:
+            kind, *args = command
+
+            if kind == "stop":
+                break
+
+            elif kind == "run":
+                running = True
+                rate = args[0]
+                due = time.perf_counter()
+
+            elif kind == "rate":
+                rate = args[0]
+
+            elif kind == "pause":
+                running = False
+                publish()
+                replies.put(True)
+
+            elif kind == "load":
+                simulation.map[:] = frames[args[0]]
+                simulation.edited = True
+
+            elif kind == "step":
+                for _ in range(args[0]):
+                    tick_ns = tick()
+                publish()
+                replies.put(True)
+
+            elif kind == "jump":
+                jumped = simulation.jump(args[0])
+                changed.fill(True)
+                publish()
+                replies.put(jumped)
+
+            continue
+
+        tick_ns = tick()
+
+        # Paced generations are all published, unpaced ones no faster than the frames are drawn
+        now = time.perf_counter()
+        if rate or now - published >= 1 / frame_rate:
+            publish()
+            published = now
+
+        if rate:
+            due = max(due + 1 / rate, now - 1 / rate)
+
+    simulation.close()
+    if log is not None:
+        log.close()
+
+    # Drop the arrays before closing the memory they point into, which publish refers to through the same names
+    frames = None
+    tiles = None
+    block.close()
+
+
+class SimulationProcess:
+    # The simulation runs in another process, which the game checks to pick how it plays
+    remote = True
+
+    def __init__(self, w: int, h: int, stats_log: str = "", frame_rate: float = 60, **options):
+        """
+        Start a worker process running a simulation, with an empty board.
+        It presents the same board, stats and commands as simulation.Simulation,
+        and on top of that can run on its own, publishing frames the game picks up with poll.
+
+        :param w: The width of the board in cells
+        :param h: The height of the board in cells
+        :param stats_log: The file the worker logs every generation to, an empty string logging nothing
+        :param frame_rate: The most frames published per second when running unpaced
+        :param options: The options of the simulation.Simulation, such as the engine and rule
+        """
+
+        self.w = w
+        self.h = h
+
+        self.block = SharedMemory(create=True, size=SLOTS * h * w)
+        self.frames = np.ndarray((SLOTS, h, w), dtype="uint8", buffer=self.block.buf)
+        self.frames.fill(0)
+
+        # Spawn starts the worker fresh, rather than forking the window and the rest of the pygame state
+        context = multiprocessing.get_context("spawn")
+
+        self.header = context.RawArray("q", SLOTS + SLOTS * FIELDS)
+        self.header[LATEST] = 0
+        self.header[READING] = 0
+        self.header[PREVIOUS] = -1
+        self.lock = context.Lock()
+
+        # The tiles the worker changed since a frame was last picked up, so only those are compared to find the cells
+        self.dirty = context.RawArray("b", -(-h // TILE_SIZE) * -(-w // TILE_SIZE))
+        self.tiles = np.frombuffer(self.dirty, dtype="bool").reshape(-(-h // TILE_SIZE), -(-w // TILE_SIZE))
+
+        self.commands = context.Queue()
+        self.replies = context.Queue()
+
+        # The worker is not daemonic, as daemonic processes can not start the workers of the processes engine,
+        # so close must always be called to stop it
+        self.process = context.Process(
+            target=serve,
+            args=(
+                self.block.name, h, w, options, stats_log, frame_rate,
+                self.commands, self.replies, self.header, self.dirty, self.lock
+            )
+        )
+        self.process.start()
+
+        # Whether the board has been edited since it was last sent to the worker
+        self.edited = False
+        self.running = False
+
+    @property
+    def map(self) -> np.ndarray:
+        """
+        The frame being drawn, a view into the shared buffer, which the game may edit while the worker is paused.
+
+        :return: The map, as a np.ndarray of shape (h, w)
+        """
+
+        return self.frames[self.header[READING]]
+
+    def field(self, field: int) -> int:
+        """
+        Read a field of the frame being drawn.
+
+        :param field: The index of the field, such as GENERATION
+        :return: The value
+        """
+
+        return self.header[SLOTS + self.header[READING] * FIELDS + field]
+
+    @property
+    def generation(self) -> int:
+        return self.field(GENERATION)
+
+    @property
+    def population(self) -> int:
+        return self.field(POPULATION)
+
+    @property
+    def births(self) -> int:
+        return self.field(BIRTHS)
+
+    @property
+    def deaths(self) -> int:
+        return self.field(DEATHS)
+
+    @property
+    def tick_seconds(self) -> float:
+        return self.field(TICK_NS) / 1e9
+
+    def status(self) -> str:
+        """
+        Describe the state of the board being drawn.
+
+        :return: The generation, or the generation the cycle starts at and its period once the board repeats itself
+        """
+
+        if self.field(PERIOD):
+            return f"stable, period {self.field(PERIOD)} from gen {self.field(START)}"
+
+        return f"generation {self.generation}"
+
+    def poll(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Pick up the newest complete frame, if there is a new one, and hold it for drawing.
+
+        :return: The row and column indexes of the cells that differ from the frame drawn before, or None
+        """
+
+        with self.lock:
+            if self.header[LATEST] == self.header[READING]:
+                self.check()
+                return None
+
+            self.header[PREVIOUS] = self.header[READING]
+            self.header[READING] = self.header[LATEST]
+
+            tiles = self.tiles.copy()
+            self.tiles.fill(False)
+
+        # The previous frame is held until it has been compared, so the worker does not write over it meanwhile.
+        # Only the rows of tiles the worker changed are compared, which for most boards is a small part of them.
+        new = self.frames[self.header[READING]]
+        old = self.frames[self.header[PREVIOUS]]
+
+        changed_rows = []
+        changed_cols = []
+
+        for tile_row in np.flatnonzero(tiles.any(axis=1)).tolist():
+            start = tile_row * TILE_SIZE
+            rows, cols = np.nonzero(new[start:start + TILE_SIZE] != old[start:start + TILE_SIZE])
+            changed_rows.append(rows + start)
+            changed_cols.append(cols)
+
+        with self.lock:
+            self.header[PREVIOUS] = -1
+
+        if not changed_rows:
+            return np.zeros(0, dtype="intp"), np.zeros(0, dtype="intp")
+
+        return np.concatenate(changed_rows), np.concatenate(changed_cols)
+
+    def check(self):
+        """
+        Check the worker is still alive, as a worker that died would leave the game waiting on it forever.
+
+        :return: None, raising a RuntimeError if the worker died
+        """
+
+        if not self.process.is_alive():
+            raise RuntimeError(f"The simulation process died with exit code {self.process.exitcode}")
+
+    def reply(self):
+        """
+        Wait for the reply of the worker to the last command.
+
+        :return: The reply
+        """
+
+        while True:
+            try:
+                return self.replies.get(timeout=REPLY_TIMEOUT)
+            except queue.Empty:
+                self.check()
+
+    def send(self):
+        """
+        Send the board to the worker, if it has been edited.
+
+        :return: None
+        """
+
+        if self.edited:
+            self.commands.put(("load", self.header[READING]))
+            self.edited = False
+
+    def run(self, rate: float):
+        """
+        Let the worker run on its own.
+
+        :param rate: The generations per second, 0 running as fast as it can
+        :return: None
+        """
+
+        self.send()
+        self.commands.put(("run", rate))
+        self.running = True
+
+    def set_rate(self, rate: float):
+        """
+        Change the pace of the running worker.
+
+        :param rate: The generations per second, 0 running as fast as it can
+        :return: None
+        """
+
+        self.commands.put(("rate", rate))
+
+    def pause(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Pause the worker, and pick up the last frame it calculated.
+
+        :return: The cells that differ from the frame drawn before, as poll
+        """
+
+        self.commands.put(("pause",))
+        self.reply()
+        self.running = False
+
+        return self.poll()
+
+    def tick(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the next generation, and pick it up.
+
+        :return: The row and column indexes of the cells that differ from the frame drawn before
+        """
+
+        self.send()
+        self.commands.put(("step", 1))
+        self.reply()
+
+        changed = self.poll()
+        return changed if changed is not None else (np.zeros(0, dtype="intp"), np.zeros(0, dtype="intp"))
+
+    def jump(self, generations: int) -> bool:
+        """
+        Jump generations ahead, using the HashLife engine of the worker, and pick up the result.
+
+        :param generations: The amount of generations to jump
+        :return: Whether the jump was made, which it is not if HashLife can not run the rule or topology
+        """
+
+        self.send()
+        self.commands.put(("jump", generations))
+        jumped = self.reply()
+
+        self.poll()
+        return jumped
+
+    def clear(self):
+        """
+        Clear the map of marked cells
+
+        :return: None
+        """
+
+        self.map.fill(0)
+        self.edited = True
+
+    def close(self):
+        """
+        Stop the worker process and free the shared memory.
+
+        :return: None
+        """
+
+        if self.process is None:
+            return
+
+        if self.process.is_alive():
+            self.commands.put(("stop",))
+            self.process.join(STOP_TIMEOUT)
+
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+
+        self.process = None
+
+        # Drop the array before closing the memory it points into
+        self.frames = None
+
+        self.block.close()
+        self.block.unlink()